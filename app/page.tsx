@@ -253,8 +253,21 @@ export default function Dashboard() {
       return
     }
 
-    // Optional: wait a bit if inference takes time
-    await new Promise((resolve) => setTimeout(resolve, 3000))
+    // Analysis runs as a background job; poll until it finishes
+    const { job_id } = await detectRes.json()
+    let job = { status: "queued", error: null }
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 2000))
+      const jobRes = await fetch(`http://localhost:8000/ai/jobs/${job_id}`)
+      job = await jobRes.json()
+    }
+
+    if (job.status !== "completed") {
+      console.error("Analysis job failed:", job.error)
+      alert("AI detection failed.")
+      setLoading(false)
+      return
+    }
 
     // Second call: Get summary
     const summaryRes = await fetch(`http://localhost:8000/ai/summary?video_id=${video.id}`)
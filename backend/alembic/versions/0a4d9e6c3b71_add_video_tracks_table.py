@@ -0,0 +1,42 @@
+"""add video tracks table
+
+Revision ID: 0a4d9e6c3b71
+Revises: f1b7c4e8a2d6
+Create Date: 2026-10-17 16:08:52.741906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4d9e6c3b71'
+down_revision: Union[str, Sequence[str], None] = 'f1b7c4e8a2d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('video_tracks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('video_id', sa.String(), nullable=False),
+    sa.Column('track_id', sa.Integer(), nullable=False),
+    sa.Column('object_class', sa.String(), nullable=False),
+    sa.Column('first_frame', sa.Integer(), nullable=False),
+    sa.Column('last_frame', sa.Integer(), nullable=False),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.Column('best_confidence', sa.Float(), nullable=False),
+    sa.Column('best_box', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['video_uploads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_video_tracks_video_id'), 'video_tracks', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_video_tracks_video_id'), table_name='video_tracks')
+    op.drop_table('video_tracks')
@@ -0,0 +1,39 @@
+"""add video detection stores table
+
+Revision ID: 2c8f5a1d7e94
+Revises: 0a4d9e6c3b71
+Create Date: 2026-10-17 16:37:14.582390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f5a1d7e94'
+down_revision: Union[str, Sequence[str], None] = '0a4d9e6c3b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('video_detection_stores',
+    sa.Column('video_id', sa.String(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('format', sa.String(), nullable=False),
+    sa.Column('fps', sa.Float(), nullable=False),
+    sa.Column('frames', sa.Integer(), nullable=False),
+    sa.Column('detections', sa.Integer(), nullable=False),
+    sa.Column('class_names', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['video_uploads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('video_detection_stores')
@@ -0,0 +1,44 @@
+"""add analysis jobs table
+
+Revision ID: 4b7e2c9d1a3f
+Revises: 1e6551f1e7f7
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2c9d1a3f'
+down_revision: Union[str, Sequence[str], None] = '1e6551f1e7f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analysis_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('video_id', sa.String(), nullable=False),
+    sa.Column('video_url', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('stage', sa.String(), nullable=True),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analysis_jobs_id'), 'analysis_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_analysis_jobs_video_id'), 'analysis_jobs', ['video_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_analysis_jobs_video_id'), table_name='analysis_jobs')
+    op.drop_index(op.f('ix_analysis_jobs_id'), table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
@@ -0,0 +1,30 @@
+"""add analysis job claims
+
+Revision ID: 5f8c2e7a9d31
+Revises: 7d3a9c5e1f28
+Create Date: 2026-10-18 11:02:37.448120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f8c2e7a9d31'
+down_revision: Union[str, Sequence[str], None] = '7d3a9c5e1f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('analysis_jobs', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('analysis_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('analysis_jobs', 'heartbeat_at')
+    op.drop_column('analysis_jobs', 'claimed_by')
@@ -0,0 +1,50 @@
+"""add detection rollups table
+
+Revision ID: 7d3a9c5e1f28
+Revises: 2c8f5a1d7e94
+Create Date: 2026-10-17 17:52:09.318544
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a9c5e1f28'
+down_revision: Union[str, Sequence[str], None] = '2c8f5a1d7e94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('detection_rollups',
+    sa.Column('resolution', sa.String(), nullable=False),
+    sa.Column('stream_id', sa.String(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('confidence_sum', sa.Float(), nullable=False),
+    sa.Column('max_confidence', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['stream_id'], ['streams.id'], ),
+    sa.PrimaryKeyConstraint('resolution', 'stream_id', 'type', 'bucket_start')
+    )
+    op.create_index('ix_detection_rollups_resolution_bucket_start', 'detection_rollups', ['resolution', 'bucket_start'], unique=False)
+    # Seed the rollups from existing rows; inserts maintain them from here on
+    for resolution in ('minute', 'hour'):
+        op.execute(
+            "INSERT INTO detection_rollups "
+            "(resolution, stream_id, type, bucket_start, count, confidence_sum, max_confidence) "
+            f"SELECT '{resolution}', stream_id, COALESCE(type, ''), date_trunc('{resolution}', timestamp), "
+            "COUNT(*), COALESCE(SUM(confidence), 0), MAX(confidence) "
+            "FROM detections WHERE stream_id IS NOT NULL AND timestamp IS NOT NULL "
+            f"GROUP BY stream_id, COALESCE(type, ''), date_trunc('{resolution}', timestamp)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_detection_rollups_resolution_bucket_start', table_name='detection_rollups')
+    op.drop_table('detection_rollups')
@@ -0,0 +1,38 @@
+"""add analysis cache table
+
+Revision ID: 8c31f0a6e5d2
+Revises: 4b7e2c9d1a3f
+Create Date: 2026-10-17 10:03:19.640531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c31f0a6e5d2'
+down_revision: Union[str, Sequence[str], None] = '4b7e2c9d1a3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analysis_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('stage', sa.String(), nullable=False),
+    sa.Column('model_version', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_analysis_cache_content_hash'), 'analysis_cache', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_analysis_cache_content_hash'), table_name='analysis_cache')
+    op.drop_table('analysis_cache')
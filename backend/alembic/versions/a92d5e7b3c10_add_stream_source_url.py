@@ -0,0 +1,28 @@
+"""add stream source url
+
+Revision ID: a92d5e7b3c10
+Revises: 8c31f0a6e5d2
+Create Date: 2026-10-17 11:26:05.118934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a92d5e7b3c10'
+down_revision: Union[str, Sequence[str], None] = '8c31f0a6e5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('streams', sa.Column('source_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('streams', 'source_url')
@@ -0,0 +1,39 @@
+"""backfill stream detection counts
+
+Revision ID: b4e8f27a6d91
+Revises: a92d5e7b3c10
+Create Date: 2026-10-17 12:40:51.772306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8f27a6d91'
+down_revision: Union[str, Sequence[str], None] = 'a92d5e7b3c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # detection_count becomes a maintained counter; seed it from existing rows
+    op.execute(
+        "UPDATE streams SET detection_count = "
+        "(SELECT COUNT(*) FROM detections WHERE detections.stream_id = streams.id)"
+    )
+    op.alter_column('streams', 'detection_count',
+               existing_type=sa.Integer(),
+               nullable=False,
+               server_default='0')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('streams', 'detection_count',
+               existing_type=sa.Integer(),
+               nullable=True,
+               server_default=None)
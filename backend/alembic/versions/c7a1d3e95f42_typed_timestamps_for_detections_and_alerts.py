@@ -0,0 +1,46 @@
+"""typed timestamps and stream indexes for detections and alerts
+
+Revision ID: c7a1d3e95f42
+Revises: b4e8f27a6d91
+Create Date: 2026-10-17 13:58:27.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1d3e95f42'
+down_revision: Union[str, Sequence[str], None] = 'b4e8f27a6d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Values that are not a parseable date (e.g. the simulator's "just now") become NULL
+TO_TIMESTAMP = (
+    "CASE WHEN timestamp ~ '^\\d{4}-\\d{2}-\\d{2}' "
+    "THEN timestamp::timestamp ELSE NULL END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('detections', 'alerts'):
+        op.alter_column(table, 'timestamp',
+                   existing_type=sa.String(),
+                   type_=sa.DateTime(),
+                   postgresql_using=TO_TIMESTAMP)
+        op.create_index(op.f(f'ix_{table}_timestamp'), table, ['timestamp'], unique=False)
+        op.create_index(f'ix_{table}_stream_id_timestamp', table, ['stream_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('detections', 'alerts'):
+        op.drop_index(f'ix_{table}_stream_id_timestamp', table_name=table)
+        op.drop_index(op.f(f'ix_{table}_timestamp'), table_name=table)
+        op.alter_column(table, 'timestamp',
+                   existing_type=sa.DateTime(),
+                   type_=sa.String(),
+                   postgresql_using="to_char(timestamp, 'YYYY-MM-DD HH24:MI:SS')")
@@ -0,0 +1,48 @@
+"""index video_id and cascade deletes on per-video result tables
+
+Revision ID: d3f6b8a2c514
+Revises: c7a1d3e95f42
+Create Date: 2026-10-17 14:47:12.385720
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f6b8a2c514'
+down_revision: Union[str, Sequence[str], None] = 'c7a1d3e95f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('video_detections', 'video_alerts', 'video_classifications', 'video_summaries')
+
+
+def _replace_foreign_key(table: str, ondelete: Union[str, None]) -> None:
+    op.drop_constraint(f'{table}_video_id_fkey', table, type_='foreignkey')
+    op.create_foreign_key(f'{table}_video_id_fkey', table, 'video_uploads',
+                          ['video_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (video_id, frame_number) also serves plain video_id lookups on detections
+    op.create_index('ix_video_detections_video_id_frame_number', 'video_detections',
+                    ['video_id', 'frame_number'], unique=False)
+    for table in TABLES[1:]:
+        op.create_index(op.f(f'ix_{table}_video_id'), table, ['video_id'], unique=False)
+
+    for table in TABLES:
+        _replace_foreign_key(table, 'CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        _replace_foreign_key(table, None)
+
+    for table in TABLES[1:]:
+        op.drop_index(op.f(f'ix_{table}_video_id'), table_name=table)
+    op.drop_index('ix_video_detections_video_id_frame_number', table_name='video_detections')
@@ -0,0 +1,39 @@
+"""add video summary aggregates table
+
+Revision ID: e5c2a9f7b318
+Revises: d3f6b8a2c514
+Create Date: 2026-10-17 15:31:40.227958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c2a9f7b318'
+down_revision: Union[str, Sequence[str], None] = 'd3f6b8a2c514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('video_summary_aggregates',
+    sa.Column('video_id', sa.String(), nullable=False),
+    sa.Column('total_frames', sa.Integer(), nullable=False),
+    sa.Column('object_counts', sa.JSON(), nullable=False),
+    sa.Column('top_frames', sa.JSON(), nullable=False),
+    sa.Column('classification', sa.JSON(), nullable=False),
+    sa.Column('alerts', sa.JSON(), nullable=False),
+    sa.Column('summary_text', sa.String(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['video_uploads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('video_summary_aggregates')
@@ -0,0 +1,32 @@
+"""add stream motion gate settings
+
+Revision ID: f1b7c4e8a2d6
+Revises: e5c2a9f7b318
+Create Date: 2026-10-17 15:42:18.305127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c4e8a2d6'
+down_revision: Union[str, Sequence[str], None] = 'e5c2a9f7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('streams', sa.Column('motion_gate_enabled', sa.Boolean(), nullable=True))
+    op.add_column('streams', sa.Column('motion_min_area', sa.Float(), nullable=True))
+    op.add_column('streams', sa.Column('motion_regions', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('streams', 'motion_regions')
+    op.drop_column('streams', 'motion_min_area')
+    op.drop_column('streams', 'motion_gate_enabled')
@@ -0,0 +1,162 @@
+"""
+Latency, memory and agreement of the VideoMAE/BLIP inference backends against fp32.
+
+Run from backend/:
+
+    python -m benchmarks.inference_backends --backends fp32,int8,onnx --videos a.mp4,b.mp4
+    python -m benchmarks.inference_backends --models videomae --threads 4 --output backends.json
+
+Each backend loads the real models (downloaded on first use). Without
+--videos, synthetic clips are generated; their labels are meaningless, but
+agreement with fp32 still shows how far a backend drifts. Agreement is top-1
+label match and max absolute logit difference for VideoMAE, and exact and
+word-overlap caption match for BLIP.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.run_benchmarks import summarize, git_commit
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare inference backends against fp32.")
+    parser.add_argument("--backends", default="fp32,int8,onnx")
+    parser.add_argument("--models", default="videomae,blip")
+    parser.add_argument("--videos", default=None, help="comma-separated video paths; defaults to synthetic clips")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per clip")
+    parser.add_argument("--threads", type=int, default=0, help="torch/ONNX Runtime intra-op threads; 0 keeps the default")
+    parser.add_argument("--output", default="inference-backends.json")
+    return parser.parse_args()
+
+
+def _load(name: str, backend: str):
+    from services import ai_utils
+    from services.model_registry import _module_bytes, _rss_bytes
+
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    processor, model = (ai_utils._load_videomae if name == "videomae" else ai_utils._load_blip)(backend)
+    load_seconds = time.perf_counter() - started
+    # Same sizing as the model registry: tensor bytes, or the ONNX session's own footprint
+    memory = _module_bytes(model) or max(_rss_bytes() - rss_before, 0)
+    return processor, model, load_seconds, memory
+
+
+def _classify(processor, model, frames):
+    import torch
+
+    inputs = processor(list(frames), return_tensors="pt")
+    with torch.no_grad():
+        return model(**inputs).logits[0]
+
+
+def _caption(processor, model, frames):
+    import torch
+    from PIL import Image
+    from services.ai_utils import CAPTION_MAX_NEW_TOKENS, CAPTION_NUM_BEAMS
+
+    inputs = processor(images=[Image.fromarray(frame) for frame in frames], return_tensors="pt")
+    with torch.no_grad():
+        out = model.generate(**inputs, max_new_tokens=CAPTION_MAX_NEW_TOKENS, num_beams=CAPTION_NUM_BEAMS)
+    return processor.batch_decode(out, skip_special_tokens=True)
+
+
+def _word_overlap(a: str, b: str) -> float:
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def run_backend(name: str, backend: str, clips: list[dict], repeat: int) -> tuple[dict, list]:
+    processor, model, load_seconds, memory = _load(name, backend)
+    run = _classify if name == "videomae" else _caption
+    key = "classification_frames" if name == "videomae" else "caption_frames"
+
+    run(processor, model, clips[0][key])  # warm-up
+    samples, outputs = [], []
+    for clip in clips:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = run(processor, model, clip[key])
+            samples.append(time.perf_counter() - started)
+        outputs.append(output)
+
+    result = {"model": name, "backend": backend, "load_seconds": round(load_seconds, 2), "memory_bytes": memory, **summarize(samples)}
+    del processor, model
+    gc.collect()
+    return result, outputs
+
+
+def agreement(name: str, outputs: list, reference: list) -> dict:
+    if name == "videomae":
+        return {
+            "top1_agreement": sum(int(o.argmax()) == int(r.argmax()) for o, r in zip(outputs, reference)) / len(reference),
+            "max_logit_diff": round(max(float((o - r).abs().max()) for o, r in zip(outputs, reference)), 4),
+        }
+    pairs = [(o, r) for clip_o, clip_r in zip(outputs, reference) for o, r in zip(clip_o, clip_r)]
+    return {
+        "exact_caption_match": round(sum(o == r for o, r in pairs) / len(pairs), 4),
+        "word_overlap": round(sum(_word_overlap(o, r) for o, r in pairs) / len(pairs), 4),
+    }
+
+
+def main():
+    args = parse_args()
+    if args.threads:
+        os.environ["TORCH_NUM_THREADS"] = str(args.threads)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from benchmarks import synthetic
+    from services.frame_pipeline import decode_video
+
+    paths = args.videos.split(",") if args.videos else list(
+        synthetic.make_videos(tempfile.mkdtemp(prefix="vms-backends-"), [4.0, 8.0]).values()
+    )
+    clips = []
+    for path in paths:
+        video = decode_video(path, detection_stride=0)
+        clips.append({"classification_frames": video.classification_frames, "caption_frames": video.caption_frames})
+
+    backends = args.backends.split(",")
+    # fp32 is the reference for agreement, so it always runs first
+    backends = ["fp32"] + [b for b in backends if b != "fp32"]
+
+    results = []
+    for name in args.models.split(","):
+        reference = None
+        for backend in backends:
+            print(f"⏳ {name} on {backend}")
+            result, outputs = run_backend(name, backend, clips, args.repeat)
+            reference = reference if reference is not None else outputs
+            result.update(agreement(name, outputs, reference))
+            results.append(result)
+            print(
+                f"  {name:<9} {backend:<5} p50={result['p50_ms']:.1f}ms "
+                f"memory={result['memory_bytes'] / 1e6:.0f}MB "
+                + " ".join(f"{k}={v}" for k, v in result.items() if k in ("top1_agreement", "max_logit_diff", "exact_caption_match", "word_overlap"))
+            )
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "threads": args.threads,
+            "videos": paths,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
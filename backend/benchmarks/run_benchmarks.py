@@ -0,0 +1,393 @@
+"""
+Offline benchmarks for the API read paths and the /ai/analyze pipeline.
+
+Run from backend/:
+
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare old.json new.json
+
+Uses a throwaway SQLite database unless --database-url is given; against
+Postgres only rows with bench-* ids are created and removed. Models are
+stubbed unless --real-models is passed.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark API and inference hot paths.")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="detection rows per data size")
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--video-seconds", default="10,60", help="synthetic video durations")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--real-models", action="store_true", help="use YOLO/VideoMAE/BLIP instead of stubs")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files")
+    return parser.parse_args()
+
+
+def summarize(samples: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "repeat": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "min_ms": round(ms[0], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def timed(fn, repeat: int, setup=None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+# --- data -----------------------------------------------------------------
+
+def stream_ids(count: int) -> list[str]:
+    return [f"bench-stream-{i:03d}" for i in range(count)]
+
+
+def clear_bench_rows(db):
+    from models import Stream, Detection, Alert, VideoUpload
+
+    db.query(Detection).filter(Detection.stream_id.like("bench-%")).delete(synchronize_session=False)
+    db.query(Alert).filter(Alert.stream_id.like("bench-%")).delete(synchronize_session=False)
+    db.query(Stream).filter(Stream.id.like("bench-%")).delete(synchronize_session=False)
+    # Per-video result rows cascade (Postgres) or are removed with the upload below
+    for table in ("video_summary_aggregates", "video_detections", "video_alerts",
+                  "video_classifications", "video_summaries"):
+        db.execute(_delete_by_video(table))
+    db.query(VideoUpload).filter(VideoUpload.id.like("bench-%")).delete(synchronize_session=False)
+    db.commit()
+
+
+def _delete_by_video(table: str):
+    from sqlalchemy import text
+    return text(f"DELETE FROM {table} WHERE video_id LIKE 'bench-%'")
+
+
+def seed(db, streams: int, detections: int, frames_per_video: int) -> dict:
+    from models import Stream, Detection, Alert, VideoUpload, VideoDetection, VideoAlert, VideoClassification, VideoSummary
+    from services.bulk_persistence import bulk_insert, insert_detections
+
+    ids = stream_ids(streams)
+    bulk_insert(db, Stream, [
+        {"id": sid, "name": sid, "status": "active", "thumbnail": "/placeholder.svg",
+         "detection_count": 0, "uptime": "100%"}
+        for sid in ids
+    ])
+
+    start = datetime.utcnow() - timedelta(days=30)
+    step = timedelta(days=30) / max(detections, 1)
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "stream_id": ids[i % streams],
+            "type": ("Person", "Vehicle", "Animal")[i % 3],
+            "confidence": 0.7 + (i % 28) / 100,
+            "timestamp": start + step * i,
+            "bbox": {"x": 10, "y": 10, "width": 50, "height": 50},
+        }
+        for i in range(detections)
+    ]
+    insert_detections(db, rows)
+    bulk_insert(db, Alert, [
+        {
+            "id": str(uuid.uuid4()),
+            "stream_id": row["stream_id"],
+            "message": f"{row['type']} detected",
+            "level": "low",
+            "timestamp": row["timestamp"],
+        }
+        for row in rows[::10]
+    ])
+
+    video_id = f"bench-video-{uuid.uuid4()}"
+    db.add(VideoUpload(id=video_id, filename="bench.mp4", storage_url="bench.mp4", uploaded_at=datetime.utcnow()))
+    db.flush()
+    bulk_insert(db, VideoDetection, [
+        {
+            "id": str(uuid.uuid4()),
+            "video_id": video_id,
+            "frame_number": i * 30,
+            "detected_objects": ["person"] * (i % 4) + ["car"] * (i % 2),
+            "timestamp": datetime.utcnow(),
+        }
+        for i in range(frames_per_video)
+    ])
+    db.add(VideoClassification(id=str(uuid.uuid4()), video_id=video_id, labels=["stub"], timestamp=datetime.utcnow()))
+    bulk_insert(db, VideoAlert, [
+        {"id": str(uuid.uuid4()), "video_id": video_id, "alert_type": "fire", "confidence": 0.8,
+         "timestamp": datetime.utcnow()}
+    ])
+    db.add(VideoSummary(id=str(uuid.uuid4()), video_id=video_id, summary_text="stub", timestamp=datetime.utcnow()))
+    db.commit()
+    return {"stream_ids": ids, "video_id": video_id}
+
+
+# --- benchmarks -----------------------------------------------------------
+
+def build_app():
+    from fastapi import FastAPI
+    from routers import streams, alerts, detections, ai_inference
+
+    app = FastAPI()
+    for module in (streams, alerts, detections, ai_inference):
+        app.include_router(module.router)
+    return app
+
+
+def bench_api(sizes: list[int], stream_count: int, repeat: int) -> list[dict]:
+    from fastapi.testclient import TestClient
+    from database import SessionLocal
+    from models import VideoSummaryAggregate
+
+    client = TestClient(build_app())
+    results = []
+
+    def get(path: str, **params):
+        # A failing endpoint must not be timed as a fast one
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        return response
+
+    for size in sizes:
+        db = SessionLocal()
+        try:
+            clear_bench_rows(db)
+            print(f"🌱 Seeding {size} detections across {stream_count} streams")
+            seeded = seed(db, stream_count, size, frames_per_video=max(size // 10, 1))
+        finally:
+            db.close()
+
+        sid = seeded["stream_ids"][0]
+        video_id = seeded["video_id"]
+        first_page = get("/detections/", limit=50)
+        cursor = first_page.headers.get("X-Next-Cursor")
+
+        def drop_aggregate():
+            db = SessionLocal()
+            try:
+                db.query(VideoSummaryAggregate).filter(VideoSummaryAggregate.video_id == video_id).delete()
+                db.commit()
+            finally:
+                db.close()
+
+        cases = [
+            ("GET /streams", lambda: get("/streams/"), None),
+            ("GET /detections", lambda: get("/detections/", limit=50), None),
+            ("GET /detections?stream_id", lambda: get("/detections/", stream_id=sid, limit=50), None),
+            ("GET /detections?after", lambda: get("/detections/", limit=50, after=cursor), None),
+            ("GET /alerts", lambda: get("/alerts/", limit=50), None),
+            ("GET /alerts?stream_id", lambda: get("/alerts/", stream_id=sid, limit=50), None),
+            ("GET /ai/summary (rebuild)", lambda: get("/ai/summary", video_id=video_id), drop_aggregate),
+            ("GET /ai/summary", lambda: get("/ai/summary", video_id=video_id), None),
+        ]
+        for name, fn, setup in cases:
+            stats = timed(fn, repeat, setup)
+            results.append({"group": "api", "name": name, "size": size, **stats})
+            print(f"  {name:<32} size={size:<8} p50={stats['p50_ms']:.2f}ms")
+
+    db = SessionLocal()
+    try:
+        clear_bench_rows(db)
+    finally:
+        db.close()
+    return results
+
+
+def bench_pipeline(durations: list[float], repeat: int, real_models: bool) -> list[dict]:
+    from benchmarks import synthetic
+    from database import SessionLocal
+    from models import VideoUpload, VideoDetection
+    from services import analysis_pipeline, result_cache, video_cache
+    from services.frame_pipeline import decode_video
+    from services.bulk_persistence import bulk_insert
+
+    if real_models:
+        from services.object_detection import detect_frames
+        from services.ai_utils import classify_frames, summarize_frames
+    else:
+        detect_frames = synthetic.stub_detect_frames
+        classify_frames = synthetic.stub_classify_frames
+        summarize_frames = synthetic.stub_summarize_frames
+        analysis_pipeline.detect_frames = detect_frames
+        analysis_pipeline.classify_frames = classify_frames
+        analysis_pipeline.summarize_frames = summarize_frames
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="vms-bench-")
+    videos = synthetic.make_videos(workdir, durations)
+    pipeline_repeat = max(1, repeat // 5)
+    # Local file server stands in for Supabase storage
+    base_url = synthetic.serve_directory(workdir)
+    video_cache.video_cache.directory = tempfile.mkdtemp(prefix="vms-bench-videos-")
+
+    for seconds, path in videos.items():
+        size = f"{int(seconds)}s"
+        frames = {"detection": [], "numbers": []}
+
+        def collect(numbers, batch):
+            frames["numbers"].extend(numbers)
+            frames["detection"].extend(batch)
+
+        def decode():
+            frames["detection"].clear()
+            frames["numbers"].clear()
+            return decode_video(path, on_detection_batch=collect)
+
+        decoded = decode()
+        detections = detect_frames(frames["detection"])
+        rows = lambda video_id: [
+            {"id": str(uuid.uuid4()), "video_id": video_id, "frame_number": n,
+             "detected_objects": d["objects"], "timestamp": datetime.utcnow()}
+            for n, d in zip(frames["numbers"], detections)
+        ]
+
+        def persist():
+            db = SessionLocal()
+            try:
+                video_id = f"bench-video-{uuid.uuid4()}"
+                db.add(VideoUpload(id=video_id, filename=path, storage_url=path, uploaded_at=datetime.utcnow()))
+                db.flush()
+                bulk_insert(db, VideoDetection, rows(video_id))
+                db.commit()
+            finally:
+                db.close()
+
+        def analyze(source=path):
+            db = SessionLocal()
+            try:
+                video_id = f"bench-video-{uuid.uuid4()}"
+                db.add(VideoUpload(id=video_id, filename=path, storage_url=source, uploaded_at=datetime.utcnow()))
+                db.commit()
+                analysis_pipeline.analyze_video(source, video_id, db)
+            finally:
+                db.close()
+
+        url = f"{base_url}/{os.path.basename(path)}"
+
+        def clear_video_cache():
+            result_cache.ENABLED = False
+            for entry in os.scandir(video_cache.video_cache.directory):
+                os.remove(entry.path)
+            video_cache.video_cache._index = None
+
+        def disable_cache():
+            result_cache.ENABLED = False
+
+        def warm_cache():
+            if not result_cache.ENABLED:
+                result_cache.ENABLED = True
+                analyze()
+
+        cases = [
+            ("decode", decode, None),
+            ("yolo", lambda: detect_frames(frames["detection"]), None),
+            ("videomae", lambda: classify_frames(decoded.classification_frames), None),
+            ("blip", lambda: summarize_frames(decoded.caption_frames), None),
+            ("persist detections", persist, None),
+            ("analyze (uncached)", analyze, disable_cache),
+            ("analyze (cached)", analyze, warm_cache),
+            ("analyze url (cold download)", lambda: analyze(url), clear_video_cache),
+            ("analyze url (video cached)", lambda: analyze(url), disable_cache),
+        ]
+        for name, fn, setup in cases:
+            stats = timed(fn, pipeline_repeat, setup)
+            results.append({
+                "group": "pipeline", "name": name, "size": size,
+                "frames": decoded.total_frames, "detection_frames": len(frames["numbers"]), **stats,
+            })
+            print(f"  {name:<32} size={size:<8} p50={stats['p50_ms']:.2f}ms")
+
+    db = SessionLocal()
+    try:
+        clear_bench_rows(db)
+    finally:
+        db.close()
+    return results
+
+
+def compare(baseline_path: str, current_path: str):
+    with open(baseline_path) as f:
+        baseline = {(r["group"], r["name"], str(r["size"])): r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = json.load(f)["results"]
+
+    print(f"{'benchmark':<44} {'size':>8} {'base p50':>10} {'now p50':>10} {'change':>8}")
+    for r in current:
+        key = (r["group"], r["name"], str(r["size"]))
+        if key not in baseline:
+            continue
+        before, after = baseline[key]["p50_ms"], r["p50_ms"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{r['group'] + ' ' + r['name']:<44} {str(r['size']):>8} {before:>10.2f} {after:>10.2f} {change:>+7.1f}%")
+
+
+def main():
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Must be set before database/models are imported
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='vms-bench-')}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from database import Base, engine
+    import models  # noqa: F401  registers tables
+
+    Base.metadata.create_all(bind=engine)
+
+    results = []
+    if not args.skip_api:
+        results += bench_api([int(s) for s in args.sizes.split(",")], args.streams, args.repeat)
+    if not args.skip_pipeline:
+        results += bench_pipeline([float(s) for s in args.video_seconds.split(",")], args.repeat, args.real_models)
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "real_models": args.real_models,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import functools
+import os
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import cv2
+import numpy as np
+
+STUB_CLASSES = ["person", "car", "dog", "bicycle"]
+
+
+def make_video(path: str, seconds: float, fps: int = 30, width: int = 320, height: int = 240) -> str:
+    """Write an mp4 that is static for the first half and has a moving box in the second."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    total = int(seconds * fps)
+
+    for i in range(total):
+        frame = background.copy()
+        if i >= total // 2:
+            x = (i * 5) % max(width - 40, 1)
+            frame[height // 3:height // 3 + 40, x:x + 40] = (0, 200, 255)
+        writer.write(frame)
+
+    writer.release()
+    return path
+
+
+def make_videos(directory: str, durations: list[float]) -> dict[float, str]:
+    os.makedirs(directory, exist_ok=True)
+    return {
+        seconds: make_video(os.path.join(directory, f"synthetic_{int(seconds)}s.mp4"), seconds)
+        for seconds in durations
+    }
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory: str) -> str:
+    """Serve ``directory`` over HTTP on a free local port (a stand-in for remote storage)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- Model stand-ins with the same inputs/outputs as the real services ---
+
+def stub_detect_frames(frames: list, batch_size: int = 16) -> list[dict]:
+    detections = []
+    for frame in frames:
+        # Cheap, deterministic work proportional to the frame size
+        n = int(frame[::16, ::16].mean()) % 4
+        class_ids = [i % len(STUB_CLASSES) for i in range(n)]
+        detections.append({
+            "objects": [STUB_CLASSES[c] for c in class_ids],
+            "class_ids": class_ids,
+            "confidences": [0.9 - 0.1 * i for i in range(n)],
+            "boxes": [[10.0 * i, 10.0 * i, 10.0 * i + 40, 10.0 * i + 40] for i in range(n)],
+        })
+    return detections
+
+
+def stub_classify_frames(frames: list) -> list[str]:
+    np.stack(frames).mean()
+    return ["stub activity"]
+
+
+def stub_summarize_frames(frames: list) -> str:
+    return " ".join(f"frame {i} shows a scene." for i in range(len(frames)))
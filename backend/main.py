@@ -1,15 +1,22 @@
+# ✅ Load environment variables from .env file before any module reads its settings
+from dotenv import load_dotenv
+load_dotenv()
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routers import streams, alerts, detections, videos
+from routers import streams, alerts, detections, videos, ingest, events
 from services.inference_simulator import simulate_detection
+from services.job_queue import start_job_monitor
+from services.model_registry import registry, WARMUP_MODELS
+from services.stream_ingest import engine as ingest_engine
+from services.segmented_detection import shutdown_pool
+from services.detection_rollups import start_retention, RETENTION_DAYS, MINUTE_ROLLUP_RETENTION_DAYS
+from services.metrics import metrics, MetricsMiddleware
 import threading
 import os
-from dotenv import load_dotenv
 from routers import ai_inference
 
-# ✅ Load environment variables from .env file
-load_dotenv()
-
 app = FastAPI(title="VMS Backend")
 
 # CORS for frontend access
@@ -19,7 +26,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "Server-Timing", "X-DB-Queries"],
 )
+# Request latency and DB queries per request; METRICS_TIMING_HEADERS=1 adds timing headers
+app.add_middleware(MetricsMiddleware)
 
 # Routes
 app.include_router(streams.router)
@@ -27,13 +37,52 @@ app.include_router(alerts.router)
 app.include_router(detections.router)
 app.include_router(videos.router)
 app.include_router(ai_inference.router)
+app.include_router(ingest.router)
+app.include_router(events.router)
 
 @app.get("/")
 def root():
     return {"message": "Video Management Backend is running"}
 
+# ✅ Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # ✅ Start simulation in background thread
 @app.on_event("startup")
 def start_simulation():
     thread = threading.Thread(target=simulate_detection, daemon=True)
     thread.start()
+
+# ✅ Pick up analysis jobs whose process died (claimed atomically, so each runs once across workers)
+@app.on_event("startup")
+def resume_analysis_jobs():
+    start_job_monitor()
+
+# ✅ Models load lazily; MODEL_WARMUP preloads them without blocking startup
+@app.on_event("startup")
+def warm_up_models():
+    registry.start_reaper()
+    if WARMUP_MODELS:
+        threading.Thread(target=registry.warm_up, args=(WARMUP_MODELS,), daemon=True).start()
+
+# ✅ INGEST_AUTOSTART=1 starts a reader for every active stream with a source
+@app.on_event("startup")
+def start_ingest():
+    if os.getenv("INGEST_AUTOSTART") == "1":
+        ingest_engine.start_all()
+
+# ✅ Prune old raw detections (DETECTION_RETENTION_DAYS) and minute rollups in the background
+@app.on_event("startup")
+def start_detection_retention():
+    if RETENTION_DAYS > 0 or MINUTE_ROLLUP_RETENTION_DAYS > 0:
+        start_retention()
+
+@app.on_event("shutdown")
+def stop_ingest():
+    ingest_engine.stop_all()
+
+@app.on_event("shutdown")
+def stop_detection_workers():
+    shutdown_pool()
@@ -1,5 +1,5 @@
 # models.py
-from sqlalchemy import Column, String, Integer, Float, JSON, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, Float, Boolean, JSON, ForeignKey, DateTime, Index
 from datetime import datetime
 from database import Base
 from sqlalchemy.dialects.postgresql import ARRAY
@@ -20,8 +20,13 @@ class Stream(Base):
     name = Column(String)
     status = Column(String)
     thumbnail = Column(String)
-    detection_count = Column(Integer)
+    detection_count = Column(Integer, nullable=False, default=0, server_default="0")  # maintained on insert
     uptime = Column(String)
+    source_url = Column(String)  # file path, rtsp:// URL or test:// for live ingest
+    # Motion gate overrides for live ingest; NULL falls back to the MOTION_GATE* settings
+    motion_gate_enabled = Column(Boolean)
+    motion_min_area = Column(Float)
+    motion_regions = Column(JSON)  # [[x, y, width, height], ...] normalized to 0-1
 
 class Detection(Base):
     __tablename__ = "detections"
@@ -29,10 +34,30 @@ class Detection(Base):
     id = Column(String, primary_key=True, index=True)
     type = Column(String)
     confidence = Column(Float)
-    timestamp = Column(String)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     bbox = Column(JSON)
     stream_id = Column(String, ForeignKey("streams.id"))
 
+    __table_args__ = (
+        Index("ix_detections_stream_id_timestamp", "stream_id", "timestamp"),
+    )
+
+class DetectionRollup(Base):
+    __tablename__ = "detection_rollups"
+
+    # Per-stream, per-type detection aggregates, maintained on insert (services/detection_rollups.py)
+    resolution = Column(String, primary_key=True)  # "minute" or "hour"
+    stream_id = Column(String, ForeignKey("streams.id"), primary_key=True)
+    type = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)  # average = confidence_sum / count
+    max_confidence = Column(Float)
+
+    __table_args__ = (
+        Index("ix_detection_rollups_resolution_bucket_start", "resolution", "bucket_start"),
+    )
+
 class Alert(Base):
     __tablename__ = "alerts"
 
@@ -40,22 +65,57 @@ class Alert(Base):
     stream_id = Column(String, ForeignKey("streams.id"))
     message = Column(String)
     level = Column(String)
-    timestamp = Column(String)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        Index("ix_alerts_stream_id_timestamp", "stream_id", "timestamp"),
+    )
 
 class VideoDetection(Base):
     __tablename__ = "video_detections"
 
     id = Column(String, primary_key=True, index=True)
-    video_id = Column(String, ForeignKey("video_uploads.id"), nullable=False)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), nullable=False)
     frame_number = Column(Integer, nullable=False)
-    detected_objects = Column(ARRAY(String), nullable=False)
+    detected_objects = Column(ARRAY(String).with_variant(JSON, "sqlite"), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_video_detections_video_id_frame_number", "video_id", "frame_number"),
+    )
+
+class VideoTrack(Base):
+    __tablename__ = "video_tracks"
+
+    # One row per tracked object instead of one per object per frame
+    id = Column(String, primary_key=True)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), nullable=False, index=True)
+    track_id = Column(Integer, nullable=False)  # unique within the video
+    object_class = Column(String, nullable=False)
+    first_frame = Column(Integer, nullable=False)
+    last_frame = Column(Integer, nullable=False)
+    observations = Column(Integer, nullable=False)  # sampled frames the object was detected in
+    best_confidence = Column(Float, nullable=False)
+    best_box = Column(JSON)  # [x1, y1, x2, y2] at best_confidence
+
+class VideoDetectionStore(Base):
+    __tablename__ = "video_detection_stores"
+
+    # Metadata for the packed per-video detection array on disk (services/detection_store.py)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), primary_key=True)
+    filename = Column(String, nullable=False)  # relative to DETECTION_STORE_DIR
+    format = Column(String, nullable=False)
+    fps = Column(Float, nullable=False)
+    frames = Column(Integer, nullable=False)  # sampled frames
+    detections = Column(Integer, nullable=False)
+    class_names = Column(JSON, nullable=False)  # class_id -> name
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class VideoClassification(Base):
     __tablename__ = "video_classifications"
 
     id = Column(String, primary_key=True, index=True)
-    video_id = Column(String, ForeignKey("video_uploads.id"), nullable=False)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), nullable=False, index=True)
     labels = Column(JSON, nullable=False)  # Example: {"label": "sports", "confidence": 92}
     timestamp = Column(DateTime, default=datetime.utcnow)
 
@@ -64,7 +124,7 @@ class VideoAlert(Base):
     __tablename__ = "video_alerts"
 
     id = Column(String, primary_key=True, index=True)
-    video_id = Column(String, ForeignKey("video_uploads.id"), nullable=False)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), nullable=False, index=True)
     alert_type = Column(String, nullable=False)  # fire / violence / accident
     confidence = Column(Float, nullable=False)   # 0-100
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -74,6 +134,48 @@ class VideoSummary(Base):
     __tablename__ = "video_summaries"
 
     id = Column(String, primary_key=True, index=True)
-    video_id = Column(String, ForeignKey("video_uploads.id"), nullable=False)
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), nullable=False, index=True)
     summary_text = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
+
+
+class VideoSummaryAggregate(Base):
+    __tablename__ = "video_summary_aggregates"
+
+    # One precomputed row per video, served directly by GET /ai/summary
+    video_id = Column(String, ForeignKey("video_uploads.id", ondelete="CASCADE"), primary_key=True)
+    total_frames = Column(Integer, nullable=False)
+    object_counts = Column(JSON, nullable=False)
+    top_frames = Column(JSON, nullable=False)
+    classification = Column(JSON, nullable=False)
+    alerts = Column(JSON, nullable=False)
+    summary_text = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    video_id = Column(String, nullable=False, index=True)
+    video_url = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued / running / completed / failed
+    stage = Column(String)
+    progress = Column(Float, default=0.0)  # 0-1
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    claimed_by = Column(String)  # process running the job (services/job_queue.INSTANCE_ID)
+    heartbeat_at = Column(DateTime)  # refreshed by the owner; stale jobs are taken over
+
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    key = Column(String, primary_key=True)  # content_hash:stage:model_version
+    content_hash = Column(String, nullable=False, index=True)
+    stage = Column(String, nullable=False)  # detection / classification / summary
+    model_version = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
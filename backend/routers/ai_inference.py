@@ -1,18 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from datetime import datetime
-
-from services.object_detection import run_object_detection
-from services.ai_utils import run_classification, detect_alerts, summarize_video
-from models import (
-    VideoDetection,
-    VideoClassification,
-    VideoAlert,
-    VideoSummary
-)
-from database import get_db
+from typing import Optional
+
+from services.job_queue import submit_job, QueueFullError
+from services.model_registry import registry
+import services.object_detection  # registers "yolo"
+import services.ai_utils  # registers "videomae" and "blip"
+from services.summary_aggregates import get_summary_async, rebuild_summary
+from services.detection_store import get_store, load_detections, timeline
+from models import AnalysisJob
+from database import get_db, get_async_db
 
 router = APIRouter(prefix="/ai", tags=["AI Inference"])
 
@@ -20,111 +19,84 @@ class DetectRequest(BaseModel):
     video_url: str
     video_id: str
 
-@router.post("/analyze")
+class WarmupRequest(BaseModel):
+    models: Optional[list[str]] = None
+
+@router.post("/analyze", status_code=202)
 def analyze_video(payload: DetectRequest, db: Session = Depends(get_db)):
     try:
-        # 1. Run Object Detection
-        results = run_object_detection(payload.video_url)
-        for item in results:
-            db.add(VideoDetection(
-                id=str(uuid4()),
-                video_id=payload.video_id,
-                frame_number=item["frame"],
-                detected_objects=item["objects"],
-                timestamp=datetime.utcnow()
-            ))
-
-        # 2. Run Classification
-        labels = run_classification(payload.video_url)
-        db.add(VideoClassification(
-            id=str(uuid4()),
-            video_id=payload.video_id,
-            labels=labels,
-            timestamp=datetime.utcnow()
-        ))
-
-        # 3. Detect Alerts (fire, violence, etc.)
-        alerts = detect_alerts(payload.video_url)
-        for alert in alerts:
-            db.add(VideoAlert(
-                id=str(uuid4()),
-                video_id=payload.video_id,
-                alert_type=alert["type"],
-                confidence=alert["confidence"],
-                timestamp=datetime.utcnow()
-            ))
-
-        # 4. Summarize Video
-        summary_text = summarize_video(payload.video_url)
-        db.add(VideoSummary(
-            id=str(uuid4()),
-            video_id=payload.video_id,
-            summary_text=summary_text,
-            timestamp=datetime.utcnow()
-        ))
-
-        db.commit()
-
-        return {
-            "success": True,
-            "object_detection": results,
-            "classification": labels,
-            "alerts": alerts,
-            "summary": summary_text
-        }
-
+        job = submit_job(db, payload.video_url, payload.video_id)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status
+    }
 
-@router.get("/summary")
-def summarize_detection(video_id: str, db: Session = Depends(get_db)):
-    # Get detections
-    detections = db.query(VideoDetection).filter_by(video_id=video_id).all()
-
-    if not detections:
-        return {"summary": None}
-
-    object_counts = {}
-    frame_summaries = []
-
-    for d in detections:
-        for obj in d.detected_objects:
-            object_counts[obj] = object_counts.get(obj, 0) + 1
-        frame_summaries.append({
-            "frame": d.frame_number,
-            "objects": d.detected_objects
-        })
-
-    top_frames = sorted(frame_summaries, key=lambda x: len(x["objects"]), reverse=True)[:5]
-
-    # Get classification labels
-    classification = db.query(VideoClassification).filter_by(video_id=video_id).first()
-    classification_labels = classification.labels if classification else []
-
-    # Get alerts
-    alerts = db.query(VideoAlert).filter_by(video_id=video_id).all()
-    alert_data = [
-        {
-            "type": a.alert_type,
-            "confidence": a.confidence,
-            "timestamp": a.timestamp
-        }
-        for a in alerts
-    ]
-
-    # Get video summary
-    summary_entry = db.query(VideoSummary).filter_by(video_id=video_id).first()
-    summary_text = summary_entry.summary_text if summary_entry else ""
 
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(AnalysisJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "id": job.id,
+        "video_id": job.video_id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None
+    }
+
+
+@router.get("/models")
+def get_models():
+    return registry.stats()
+
+
+@router.post("/models/warmup")
+def warm_up_models(payload: WarmupRequest):
+    try:
+        return registry.warm_up(payload.models)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/summary")
+async def summarize_detection(video_id: str, db: AsyncSession = Depends(get_async_db)):
+    # Precomputed at analysis time; rebuilt once for videos analyzed before that
+    return {"summary": await get_summary_async(db, video_id)}
+
+
+@router.post("/summary/{video_id}/rebuild")
+def rebuild_video_summary(video_id: str, db: Session = Depends(get_db)):
+    summary = rebuild_summary(db, video_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No detections for this video")
+    return {"summary": summary}
+
+
+@router.get("/timeline")
+def detection_timeline(video_id: str, bucket_seconds: float = 10.0, db: Session = Depends(get_db)):
+    if bucket_seconds <= 0:
+        raise HTTPException(status_code=400, detail="bucket_seconds must be positive")
+    store = get_store(db, video_id)
+    if store is None:
+        raise HTTPException(status_code=404, detail="No stored detections for this video")
+    records = load_detections(store)
+    if records is None:
+        raise HTTPException(status_code=404, detail="Stored detections file is missing for this video")
     return {
-        "summary": {
-            "total_frames": len(set([d.frame_number for d in detections])),
-            "object_counts": object_counts,
-            "top_frames": top_frames,
-            "classification": classification_labels,
-            "alerts": alert_data,
-            "summary_text": summary_text
-        }
+        "video_id": video_id,
+        "bucket_seconds": bucket_seconds,
+        "timeline": timeline(records, store.class_names, store.fps, bucket_seconds),
     }
@@ -1,29 +1,49 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from models import Alert
-from database import SessionLocal
+from database import get_db, get_async_db
 from schemas import AlertBase
+from services.pagination import keyset_filter, keyset_result
+from services.event_hub import hub, alert_event
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=list[AlertBase])
-def get_alerts(
+async def get_alerts(
+    response: Response,
     stream_id: str = Query(None),
-    limit: int = Query(5),
-    db: Session = Depends(get_db),
+    limit: int = Query(5, ge=1, le=500),
+    after: str = Query(None, description="Cursor from X-Next-Cursor: older rows"),
+    before: str = Query(None, description="Cursor from X-Prev-Cursor: newer rows"),
+    since: datetime = Query(None),
+    until: datetime = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Alert).order_by(desc(Alert.timestamp))
+    query = select(Alert)
     if stream_id:
         query = query.filter(Alert.stream_id == stream_id)
-    return query.limit(limit).all()
+    if since:
+        query = query.filter(Alert.timestamp >= since)
+    if until:
+        query = query.filter(Alert.timestamp < until)
+
+    try:
+        query = keyset_filter(query, Alert.timestamp, Alert.id, limit, after=after, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(query)
+    rows, next_cursor, prev_cursor = keyset_result(result.scalars().all(), limit, after=after, before=before)
+
+    # Cursors travel in headers so the body stays a plain list
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return rows
 
 @router.post("/", response_model=AlertBase)
 def create_alert(alert: AlertBase, db: Session = Depends(get_db)):
@@ -31,4 +51,5 @@ def create_alert(alert: AlertBase, db: Session = Depends(get_db)):
     db.add(db_alert)
     db.commit()
     db.refresh(db_alert)
+    hub.publish("alert", [alert_event(db_alert)])
     return db_alert
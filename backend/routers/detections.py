@@ -1,34 +1,145 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from models import Detection
-from database import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from models import Detection, DetectionRollup
+from database import get_db, get_async_db
 from schemas import DetectionBase
+from services.pagination import keyset_filter, keyset_result
+from services.bulk_persistence import insert_detections, increment_detection_counts
+from services.detection_rollups import update_rollups, rebuild_rollups, RESOLUTIONS
+from services.event_hub import hub, detection_event
 
 router = APIRouter(prefix="/detections", tags=["Detections"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/", response_model=list[DetectionBase])
-def get_detections(
+async def get_detections(
+    response: Response,
     stream_id: str = Query(None),
-    limit: int = Query(20),
-    db: Session = Depends(get_db),
+    limit: int = Query(20, ge=1, le=500),
+    after: str = Query(None, description="Cursor from X-Next-Cursor: older rows"),
+    before: str = Query(None, description="Cursor from X-Prev-Cursor: newer rows"),
+    since: datetime = Query(None),
+    until: datetime = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Detection).order_by(desc(Detection.timestamp))
+    query = select(Detection)
     if stream_id:
         query = query.filter(Detection.stream_id == stream_id)
-    return query.limit(limit).all()
+    if since:
+        query = query.filter(Detection.timestamp >= since)
+    if until:
+        query = query.filter(Detection.timestamp < until)
+
+    try:
+        query = keyset_filter(query, Detection.timestamp, Detection.id, limit, after=after, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(query)
+    rows, next_cursor, prev_cursor = keyset_result(result.scalars().all(), limit, after=after, before=before)
+
+    # Cursors travel in headers so the body stays a plain list
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return rows
 
 @router.post("/", response_model=DetectionBase)
 def create_detection(detection: DetectionBase, db: Session = Depends(get_db)):
     db_detection = Detection(**detection.dict())
     db.add(db_detection)
+    increment_detection_counts(db, {detection.stream_id: 1})
+    update_rollups(db, [detection.dict()])
     db.commit()
     db.refresh(db_detection)
+    hub.publish("detection", [detection_event(db_detection)])
     return db_detection
+
+@router.post("/bulk")
+def create_detections_bulk(detections: list[DetectionBase], db: Session = Depends(get_db)):
+    rows = [d.dict() for d in detections]
+    inserted = insert_detections(db, rows)
+    db.commit()
+    hub.publish("detection", [detection_event(row) for row in rows])
+    return {"inserted": inserted}
+
+def _rollup_window(query, since: datetime, until: datetime, stream_id: str, type: str):
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(days=1)
+    query = query.where(DetectionRollup.bucket_start >= since, DetectionRollup.bucket_start < until)
+    if stream_id:
+        query = query.where(DetectionRollup.stream_id == stream_id)
+    if type:
+        query = query.where(DetectionRollup.type == type)
+    return query
+
+@router.get("/rollups")
+async def get_detection_rollups(
+    resolution: str = Query("minute", description="minute or hour"),
+    stream_id: str = Query(None),
+    type: str = Query(None),
+    since: datetime = Query(None, description="Defaults to 24 hours before until"),
+    until: datetime = Query(None, description="Defaults to now"),
+    limit: int = Query(1440, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Chart series from the maintained rollups: cost depends on the window, not on history kept
+    if resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    query = _rollup_window(select(DetectionRollup), since, until, stream_id, type)
+    query = query.where(DetectionRollup.resolution == resolution).order_by(
+        DetectionRollup.bucket_start, DetectionRollup.stream_id, DetectionRollup.type
+    ).limit(limit)
+
+    result = await db.execute(query)
+    return [
+        {
+            "bucket_start": rollup.bucket_start,
+            "stream_id": rollup.stream_id,
+            "type": rollup.type,
+            "count": rollup.count,
+            "avg_confidence": round(rollup.confidence_sum / rollup.count, 4) if rollup.count else None,
+            "max_confidence": rollup.max_confidence,
+        }
+        for rollup in result.scalars().all()
+    ]
+
+@router.get("/rollups/totals")
+async def get_detection_totals(
+    stream_id: str = Query(None),
+    type: str = Query(None),
+    since: datetime = Query(None, description="Defaults to 24 hours before until; rounded to hours"),
+    until: datetime = Query(None, description="Defaults to now"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Per-stream, per-type totals summed from hour rollups
+    query = _rollup_window(
+        select(
+            DetectionRollup.stream_id,
+            DetectionRollup.type,
+            func.sum(DetectionRollup.count),
+            func.sum(DetectionRollup.confidence_sum),
+            func.max(DetectionRollup.max_confidence),
+        ),
+        since, until, stream_id, type,
+    )
+    query = query.where(DetectionRollup.resolution == "hour").group_by(DetectionRollup.stream_id, DetectionRollup.type)
+
+    result = await db.execute(query)
+    return [
+        {
+            "stream_id": row_stream,
+            "type": row_type,
+            "count": count,
+            "avg_confidence": round(confidence_sum / count, 4) if count else None,
+            "max_confidence": max_confidence,
+        }
+        for row_stream, row_type, count, confidence_sum, max_confidence in result.all()
+    ]
+
+@router.post("/rollups/rebuild")
+def rebuild_detection_rollups(db: Session = Depends(get_db)):
+    return {"rows": rebuild_rollups(db)}
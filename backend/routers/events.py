@@ -0,0 +1,37 @@
+import asyncio
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from services.event_hub import hub, format_sse
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+KEEPALIVE_SECONDS = 15
+
+@router.get("/")
+async def stream_events(request: Request, stream_id: str = Query(None)):
+    """Server-Sent Events feed of new detections and alerts, optionally for one stream."""
+    subscription = hub.subscribe(stream_id)
+
+    async def event_source():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+def get_event_stats():
+    return hub.stats()
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_db
+from models import Stream
+from services.stream_ingest import engine
+from services.motion_gate import MotionSettings
+
+router = APIRouter(prefix="/ingest", tags=["Ingest"])
+
+class IngestStartRequest(BaseModel):
+    source_url: Optional[str] = None
+    # Saved on the stream; omitted fields keep their current value
+    motion_gate_enabled: Optional[bool] = None
+    motion_min_area: Optional[float] = None
+    motion_regions: Optional[list[list[float]]] = None
+
+@router.get("/stats")
+def get_ingest_stats():
+    return engine.stats()
+
+@router.post("/{stream_id}/start")
+def start_ingest(stream_id: str, payload: IngestStartRequest, db: Session = Depends(get_db)):
+    stream = db.query(Stream).filter(Stream.id == stream_id).first()
+    if not stream:
+        raise HTTPException(status_code=404, detail="Stream not found")
+
+    if any(len(region) != 4 for region in payload.motion_regions or []):
+        raise HTTPException(status_code=400, detail="motion_regions entries must be [x, y, width, height]")
+
+    for field in ("source_url", "motion_gate_enabled", "motion_min_area", "motion_regions"):
+        value = getattr(payload, field)
+        if value is not None:
+            setattr(stream, field, value)
+    db.commit()
+    if not stream.source_url:
+        raise HTTPException(status_code=400, detail="Stream has no source_url")
+
+    motion = MotionSettings.for_stream(stream)
+    engine.start_stream(stream.id, stream.source_url, motion)
+    return {
+        "message": "Ingest started",
+        "stream_id": stream.id,
+        "source_url": stream.source_url,
+        "motion_gate": {"enabled": motion.enabled, "min_area": motion.min_area, "regions": motion.regions}
+    }
+
+@router.post("/{stream_id}/stop")
+def stop_ingest(stream_id: str):
+    if not engine.stop_stream(stream_id):
+        raise HTTPException(status_code=404, detail="Stream is not being ingested")
+    return {"message": "Ingest stopped", "stream_id": stream_id}
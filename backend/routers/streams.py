@@ -1,67 +1,47 @@
 # routers/streams.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import SessionLocal
-from models import Stream, Detection, Alert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from database import get_async_db
+from models import Stream, Alert
 
 router = APIRouter(prefix="/streams", tags=["Streams"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.get("/")
-def get_streams(db: Session = Depends(get_db)):
-    streams = db.query(Stream).all()
-    enriched_streams = []
-
-    for stream in streams:
-        # Count detections
-        detection_count = db.query(func.count(Detection.id)).filter(Detection.stream_id == stream.id).scalar()
-
-        # Get latest alert message
-        latest_alert = (
-            db.query(Alert)
-            .filter(Alert.stream_id == stream.id)
-            .order_by(Alert.timestamp.desc())
-            .first()
-        )
-        enriched_streams.append({
-            "id": stream.id,
-            "name": stream.name,
-            "status": stream.status,
-            "thumbnail": stream.thumbnail,
-            "detection_count": detection_count,
-            "last_alert": latest_alert.message if latest_alert else None,
-            "uptime": stream.uptime,
-        })
-
-    return enriched_streams
-
-@router.get("/{stream_id}")
-def get_stream_by_id(stream_id: str, db: Session = Depends(get_db)):
-    stream = db.query(Stream).filter(Stream.id == stream_id).first()
-    if not stream:
-        raise HTTPException(status_code=404, detail="Stream not found")
-
-    detection_count = db.query(func.count(Detection.id)).filter(Detection.stream_id == stream.id).scalar()
+def _stream_rows():
+    # Latest alert per stream as a correlated subquery inside the same statement
     latest_alert = (
-        db.query(Alert)
-        .filter(Alert.stream_id == stream.id)
+        select(Alert.message)
+        .where(Alert.stream_id == Stream.id, Alert.timestamp.isnot(None))
         .order_by(Alert.timestamp.desc())
-        .first()
+        .limit(1)
+        .correlate(Stream)
+        .scalar_subquery()
     )
+    return select(Stream, latest_alert.label("last_alert"))
 
+def _serialize(stream: Stream, last_alert):
     return {
         "id": stream.id,
         "name": stream.name,
         "status": stream.status,
         "thumbnail": stream.thumbnail,
-        "detection_count": detection_count,
-        "last_alert": latest_alert.message if latest_alert else None,
+        "detection_count": stream.detection_count or 0,
+        "last_alert": last_alert,
         "uptime": stream.uptime,
     }
+
+@router.get("/")
+async def get_streams(db: AsyncSession = Depends(get_async_db)):
+    # One query: detection counts come from the maintained streams.detection_count counter
+    result = await db.execute(_stream_rows())
+    return [_serialize(stream, last_alert) for stream, last_alert in result.all()]
+
+@router.get("/{stream_id}")
+async def get_stream_by_id(stream_id: str, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(_stream_rows().where(Stream.id == stream_id))
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Stream not found")
+
+    stream, last_alert = row
+    return _serialize(stream, last_alert)
@@ -4,11 +4,11 @@ from uuid import uuid4
 from sqlalchemy.orm import Session
 from database import get_db
 from models import VideoUpload
+from services.detection_store import get_store, delete_detections
 from datetime import datetime
 import os
 from supabase import create_client
 from dotenv import load_dotenv
-from models import VideoUpload, VideoDetection, VideoAlert, VideoClassification, VideoSummary
 
 
 load_dotenv()  # ✅ Load .env variables before using them
@@ -72,12 +72,6 @@ def delete_video(video_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Video not found")
 
     try:
-        # 🧹 Delete all related records first
-        db.query(VideoAlert).filter(VideoAlert.video_id == video_id).delete()
-        db.query(VideoClassification).filter(VideoClassification.video_id == video_id).delete()
-        db.query(VideoDetection).filter(VideoDetection.video_id == video_id).delete()
-        db.query(VideoSummary).filter(VideoSummary.video_id == video_id).delete()
-
         # ✅ Delete file from Supabase
         filename = video.storage_url.split("/")[-1]
         delete_response = supabase.storage.from_("videos").remove([filename])
@@ -86,9 +80,12 @@ def delete_video(video_id: str, db: Session = Depends(get_db)):
         if isinstance(delete_response, dict) and delete_response.get("error"):
             raise Exception(delete_response["error"]["message"])
 
-        # 🗃️ Now delete main video record
+        # 🗃️ Delete main video record; results go with it via ON DELETE CASCADE
+        store = get_store(db, video_id)
         db.delete(video)
         db.commit()
+        if store is not None:
+            delete_detections(store)
 
         return {"message": "Video deleted successfully"}
 
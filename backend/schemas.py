@@ -27,7 +27,7 @@ class DetectionBase(BaseModel):
     stream_id: str
     type: str
     confidence: float
-    timestamp: str
+    timestamp: datetime
     bbox: Dict[str, float]
 
     class Config:
@@ -38,7 +38,7 @@ class AlertBase(BaseModel):
     stream_id: str
     message: str
     level: str
-    timestamp: str
+    timestamp: datetime
 
     class Config:
         orm_mode = True
@@ -24,9 +24,10 @@ db = SessionLocal()
 for s in streams:
     existing = db.query(Stream).filter(Stream.id == s["id"]).first()
     if existing:
-        # Update the fields
+        # Update the fields; detection_count is a live counter, keep it
         for key, value in s.items():
-            setattr(existing, key, value)
+            if key != "detection_count":
+                setattr(existing, key, value)
     else:
         db.add(Stream(**s))
 
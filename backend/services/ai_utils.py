@@ -1,47 +1,86 @@
-import torch
-import numpy as np
-from uuid import uuid4
-from PIL import Image
-import decord
-from decord import VideoReader, cpu
-from transformers import (
-    AutoImageProcessor,
-    VideoMAEForVideoClassification,
-    BlipProcessor,
-    BlipForConditionalGeneration
+import os
+
+from services.frame_pipeline import decode_video
+from services.model_registry import registry
+from services.video_cache import video_cache
+from services.metrics import stage_seconds, frames_processed
+from services.inference_backend import (
+    VIDEOMAE_BACKEND,
+    BLIP_BACKEND,
+    configure_torch,
+    prepare_video_classifier,
+    prepare_generator,
 )
 
-# === Load models once globally ===
+VIDEO_MODEL_NAME = "MCG-NJU/videomae-base-finetuned-kinetics"
+VIDEO_MODEL_REVISION = os.getenv("VIDEOMAE_REVISION", "main")
+VIDEO_MODEL_VERSION = f"{VIDEO_MODEL_NAME}@{VIDEO_MODEL_REVISION}"
+
+CAPTION_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+CAPTION_MODEL_REVISION = os.getenv("BLIP_REVISION", "main")
+CAPTION_MODEL_VERSION = f"{CAPTION_MODEL_NAME}@{CAPTION_MODEL_REVISION}"
+
+SUMMARY_FAILED = "Summary generation failed."
+
+# Caption generation settings; fewer tokens/beams trade quality for latency
+CAPTION_MAX_NEW_TOKENS = int(os.getenv("CAPTION_MAX_NEW_TOKENS", "30"))
+CAPTION_NUM_BEAMS = int(os.getenv("CAPTION_NUM_BEAMS", "1"))
+# Frames per generate() call; 0 captions all sampled frames in one call
+CAPTION_BATCH_SIZE = int(os.getenv("CAPTION_BATCH_SIZE", "0"))
+
+
+# === Models are loaded by the registry on first use ===
 # For video classification
-video_processor = AutoImageProcessor.from_pretrained("MCG-NJU/videomae-base-finetuned-kinetics")
-video_model = VideoMAEForVideoClassification.from_pretrained("MCG-NJU/videomae-base-finetuned-kinetics")
+def _load_videomae(backend: str = VIDEOMAE_BACKEND):
+    from transformers import AutoImageProcessor, VideoMAEForVideoClassification
+
+    configure_torch()
+    processor = AutoImageProcessor.from_pretrained(VIDEO_MODEL_NAME, revision=VIDEO_MODEL_REVISION)
+    model = VideoMAEForVideoClassification.from_pretrained(VIDEO_MODEL_NAME, revision=VIDEO_MODEL_REVISION)
+    model.eval()
+    return processor, prepare_video_classifier(model, VIDEO_MODEL_VERSION, backend)
+
 
 # For summarization
-caption_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-caption_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
+def _load_blip(backend: str = BLIP_BACKEND):
+    from transformers import BlipProcessor, BlipForConditionalGeneration
 
-# Decord bridge
-decord.bridge.set_bridge("torch")
+    configure_torch()
+    processor = BlipProcessor.from_pretrained(CAPTION_MODEL_NAME, revision=CAPTION_MODEL_REVISION)
+    model = BlipForConditionalGeneration.from_pretrained(CAPTION_MODEL_NAME, revision=CAPTION_MODEL_REVISION)
+    model.eval()
+    return processor, prepare_generator(model, backend)
+
+
+registry.register("videomae", _load_videomae)
+registry.register("blip", _load_blip)
 
 
 def run_classification(video_url: str) -> list[str]:
     try:
-        print("🚀 [run_classification] Using HuggingFace VideoMAE model")
+        with video_cache.local_copy(video_url) as local:
+            video = decode_video(local.path, detection_stride=0, caption_count=0)
+    except Exception as e:
+        print("❌ Classification error:", e)
+        return []
+    return classify_frames(video.classification_frames)
 
-        vr = VideoReader(video_url, ctx=cpu(0))
-        indices = torch.linspace(0, len(vr) - 1, 16).long()
-        frames = vr.get_batch(indices)  # decord.NDArray, shape: (16, H, W, 3)
 
-        # Convert to torch.Tensor and permute
-        video = torch.from_numpy(frames.asnumpy()).permute(0, 3, 1, 2)  # (T, C, H, W)
+def classify_frames(frames: list) -> list[str]:
+    try:
+        import torch
 
-        # Run through processor and model
-        inputs = video_processor(list(video), return_tensors="pt")
-        with torch.no_grad():
-            outputs = video_model(**inputs)
-            predicted_label = outputs.logits.argmax(-1).item()
+        print("🚀 [run_classification] Using HuggingFace VideoMAE model")
+
+        with registry.use("videomae") as (video_processor, video_model), stage_seconds.time(stage="videomae"):
+            # Run through processor and model; frames are RGB (H, W, 3) arrays
+            inputs = video_processor(list(frames), return_tensors="pt")
+            with torch.no_grad():
+                outputs = video_model(**inputs)
+                predicted_label = outputs.logits.argmax(-1).item()
 
-        label = video_model.config.id2label[predicted_label]
+            label = video_model.config.id2label[predicted_label]
+        frames_processed.inc(len(frames), stage="videomae")
         print(f"✅ Predicted class: {label}")
         return [label]
 
@@ -60,22 +99,40 @@ def detect_alerts(video_url: str) -> list[dict]:
 
 def summarize_video(video_url: str) -> str:
     try:
-        print("🚀 [summarize_video] Running frame-level captioning")
+        with video_cache.local_copy(video_url) as local:
+            video = decode_video(local.path, detection_stride=0, classification_count=0)
+    except Exception as e:
+        print("❌ Summarization error:", e)
+        return SUMMARY_FAILED
+    return summarize_frames(video.caption_frames)
 
-        vr = VideoReader(video_url, ctx=cpu(0))
-        total_frames = len(vr)
-        indices = np.linspace(0, total_frames - 1, num=5, dtype=int)
 
-        frames = vr.get_batch(indices).asnumpy()
-        captions = []
+def summarize_frames(frames: list) -> str:
+    if not len(frames):
+        # Nothing sampled (empty or unreadable video): no captions, and no need to load BLIP
+        return ""
 
-        for frame in frames:
-            img = Image.fromarray(frame)
-            inputs = caption_processor(images=img, return_tensors="pt")
-            with torch.no_grad():
-                out = caption_model.generate(**inputs)
-                caption = caption_processor.decode(out[0], skip_special_tokens=True)
-                captions.append(caption)
+    try:
+        import torch
+        from PIL import Image
+
+        print("🚀 [summarize_video] Running frame-level captioning")
+
+        captions = []
+        images = [Image.fromarray(frame) for frame in frames]
+        batch_size = CAPTION_BATCH_SIZE or len(images)
+
+        with registry.use("blip") as (caption_processor, caption_model), stage_seconds.time(stage="blip"):
+            for start in range(0, len(images), batch_size):
+                inputs = caption_processor(images=images[start:start + batch_size], return_tensors="pt")
+                with torch.no_grad():
+                    out = caption_model.generate(
+                        **inputs,
+                        max_new_tokens=CAPTION_MAX_NEW_TOKENS,
+                        num_beams=CAPTION_NUM_BEAMS,
+                    )
+                captions.extend(caption_processor.batch_decode(out, skip_special_tokens=True))
+        frames_processed.inc(len(images), stage="blip")
 
         summary = " ".join(captions)
         print("📝 Summary generated:", summary)
@@ -83,4 +140,4 @@ def summarize_video(video_url: str) -> str:
 
     except Exception as e:
         print("❌ Summarization error:", e)
-        return "Summary generation failed."
+        return SUMMARY_FAILED
@@ -0,0 +1,239 @@
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from services.frame_pipeline import decode_video, probe_video, DETECTION_STRIDE, CLASSIFICATION_FRAMES, CAPTION_FRAMES
+from services.frame_sampler import describe as describe_sampling
+from services.motion_gate import MotionGate, gated_detect, describe as describe_motion_gate
+from services.object_detection import detect_frames, MODEL_VERSION as YOLO_VERSION, BATCH_SIZE as DETECTION_BATCH_SIZE
+from services.ai_utils import (
+    classify_frames,
+    detect_alerts,
+    summarize_frames,
+    SUMMARY_FAILED,
+    VIDEO_MODEL_VERSION,
+    CAPTION_MODEL_VERSION,
+    CAPTION_MAX_NEW_TOKENS,
+    CAPTION_NUM_BEAMS
+)
+from services.inference_backend import VIDEOMAE_BACKEND, BLIP_BACKEND, resolve as resolve_backend
+from services.result_cache import result_cache, content_hash
+from services.bulk_persistence import bulk_insert
+from services.summary_aggregates import build_summary, save_summary
+from services.metrics import stage_seconds, frames_processed
+from services.segmented_detection import detect_segmented
+from services.video_cache import video_cache
+from services.object_tracker import track_detections
+from services.detection_store import save_detections
+from models import (
+    VideoDetection,
+    VideoTrack,
+    VideoClassification,
+    VideoAlert,
+    VideoSummary
+)
+
+# Cache keys change whenever a model or its sampling changes
+STAGE_VERSIONS = {
+    "detection": (
+        f"{YOLO_VERSION}/stride={DETECTION_STRIDE}/sampling={describe_sampling()}"
+        f"/gate={describe_motion_gate()}"
+    ),
+    "classification": f"{VIDEO_MODEL_VERSION}/frames={CLASSIFICATION_FRAMES}/backend={resolve_backend(VIDEOMAE_BACKEND)}",
+    "summary": (
+        f"{CAPTION_MODEL_VERSION}/frames={CAPTION_FRAMES}"
+        f"/tokens={CAPTION_MAX_NEW_TOKENS}/beams={CAPTION_NUM_BEAMS}"
+        f"/backend={resolve_backend(BLIP_BACKEND, supports_onnx=False)}"
+    ),
+}
+
+# Legacy per-frame video_detections rows are only written with STORE_FRAME_DETECTIONS=1;
+# full per-frame results always go to the packed detection store, plus one video_tracks row per object
+STORE_FRAME_DETECTIONS = os.getenv("STORE_FRAME_DETECTIONS", "0") == "1"
+
+_stale_checked = False
+
+
+def _drop_stale_cache(db: Session):
+    global _stale_checked
+    if not _stale_checked:
+        removed = result_cache.invalidate_stale(db, STAGE_VERSIONS)
+        if removed:
+            print(f"🧹 Dropped {removed} cached result(s) from older model versions")
+        _stale_checked = True
+
+
+def analyze_video(
+    video_url: str,
+    video_id: str,
+    db: Session,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+) -> dict:
+    """Run detection, classification, alerts and captioning for one video and persist the results."""
+    # Remote videos are downloaded once into the local cache; every decoder reads that copy
+    with video_cache.local_copy(video_url) as local:
+        return _analyze_local(local.path, local.content_hash, video_id, db, on_progress)
+
+
+def _analyze_local(
+    video_path: str,
+    video_hash: Optional[str],
+    video_id: str,
+    db: Session,
+    on_progress: Optional[Callable[[str, float], None]],
+) -> dict:
+    def report(stage: str, progress: float):
+        if on_progress:
+            on_progress(stage, progress)
+
+    started = time.perf_counter()
+
+    # 0. Look up results of earlier runs on the same video content
+    report("hashing", 0.0)
+    if video_hash is None:
+        with stage_seconds.time(stage="hash"):
+            video_hash = content_hash(video_path)
+    with stage_seconds.time(stage="cache_lookup"):
+        _drop_stale_cache(db)
+        results = result_cache.get(db, video_hash, "detection", STAGE_VERSIONS["detection"])
+        labels = result_cache.get(db, video_hash, "classification", STAGE_VERSIONS["classification"])
+        summary_text = result_cache.get(db, video_hash, "summary", STAGE_VERSIONS["summary"])
+    cached = [
+        stage for stage, value in (("detection", results), ("classification", labels), ("summary", summary_text))
+        if value is not None
+    ]
+
+    # 1. Decode once; detection runs batch by batch while decoding
+    report("detection", 0.05)
+    video = None
+    segmented = None
+    gate = MotionGate()
+    if len(cached) < 3:
+        detect = results is None
+        if detect:
+            # Long videos are decoded and detected in parallel segments when DETECTION_WORKERS > 1;
+            # the decode below then only reads the classification/caption frames
+            segmented = detect_segmented(video_path, batch_size=DETECTION_BATCH_SIZE)
+        if segmented is not None:
+            results, detect = segmented.results, False
+            result_cache.put(db, video_hash, "detection", STAGE_VERSIONS["detection"], results)
+        elif detect:
+            results = []
+        detect_seconds = 0.0
+        fps = probe_video(video_path)[0] if detect and gate.settings.enabled else 1.0
+
+        def on_detection_batch(frame_numbers, frames):
+            nonlocal detect_seconds
+            batch_started = time.perf_counter()
+            # Frames without motion reuse the previous frame's detections (MOTION_GATE=1)
+            detections = gated_detect(frames, [n / fps for n in frame_numbers], [gate] * len(frames), detect_frames)
+            for frame_number, detection in zip(frame_numbers, detections):
+                results.append({"frame": frame_number, **detection})
+            detect_seconds += time.perf_counter() - batch_started
+
+        decode_started = time.perf_counter()
+        video = decode_video(
+            video_path,
+            classification_count=CLASSIFICATION_FRAMES if labels is None else 0,
+            caption_count=CAPTION_FRAMES if summary_text is None else 0,
+            on_detection_batch=on_detection_batch if detect else None,
+            detection_batch_size=DETECTION_BATCH_SIZE,
+        )
+        # YOLO runs inside the decode loop and is recorded separately
+        stage_seconds.observe(time.perf_counter() - decode_started - detect_seconds, stage="decode")
+        frames_processed.inc(video.total_frames, stage="decode")
+        if detect:
+            result_cache.put(db, video_hash, "detection", STAGE_VERSIONS["detection"], results)
+
+    # Link per-frame boxes into one record per distinct object
+    fps = segmented.fps if segmented else (video.fps if video else probe_video(video_path)[0])
+    with stage_seconds.time(stage="tracking"):
+        tracks = [track.to_dict() for track in track_detections(results, fps)]
+
+    now = datetime.utcnow()
+    with stage_seconds.time(stage="persist"):
+        if STORE_FRAME_DETECTIONS:
+            bulk_insert(db, VideoDetection, [
+                {
+                    "id": str(uuid4()),
+                    "video_id": video_id,
+                    "frame_number": item["frame"],
+                    "detected_objects": item["objects"],
+                    "timestamp": now
+                }
+                for item in results
+            ])
+        save_detections(db, video_id, results, fps)
+        bulk_insert(db, VideoTrack, [
+            {"id": str(uuid4()), "video_id": video_id, **track}
+            for track in tracks
+        ])
+
+    # 2. Run Classification
+    report("classification", 0.6)
+    if labels is None:
+        labels = classify_frames(video.classification_frames)
+        if labels:
+            result_cache.put(db, video_hash, "classification", STAGE_VERSIONS["classification"], labels)
+    db.add(VideoClassification(
+        id=str(uuid4()),
+        video_id=video_id,
+        labels=labels,
+        timestamp=datetime.utcnow()
+    ))
+
+    # 3. Detect Alerts (fire, violence, etc.)
+    report("alerts", 0.75)
+    alerts = detect_alerts(video_path)
+    alerted_at = datetime.utcnow()
+    bulk_insert(db, VideoAlert, [
+        {
+            "id": str(uuid4()),
+            "video_id": video_id,
+            "alert_type": alert["type"],
+            "confidence": alert["confidence"],
+            "timestamp": alerted_at
+        }
+        for alert in alerts
+    ])
+
+    # 4. Summarize Video
+    report("summary", 0.8)
+    if summary_text is None:
+        summary_text = summarize_frames(video.caption_frames)
+        if summary_text != SUMMARY_FAILED:
+            result_cache.put(db, video_hash, "summary", STAGE_VERSIONS["summary"], summary_text)
+    db.add(VideoSummary(
+        id=str(uuid4()),
+        video_id=video_id,
+        summary_text=summary_text,
+        timestamp=datetime.utcnow()
+    ))
+
+    # 5. Precompute what GET /ai/summary serves
+    report("saving", 0.95)
+    save_summary(db, video_id, build_summary(
+        results,
+        labels,
+        [{**alert, "timestamp": alerted_at} for alert in alerts],
+        summary_text,
+        tracks
+    ))
+    with stage_seconds.time(stage="db_commit"):
+        db.commit()
+    stage_seconds.observe(time.perf_counter() - started, stage="total")
+
+    return {
+        "object_detection": results,
+        "tracks": tracks,
+        "classification": labels,
+        "alerts": alerts,
+        "summary": summary_text,
+        "cached_stages": cached,
+        "sampling": segmented.sampling if segmented else (video.sampling if video else {}),
+        "motion_gate": segmented.motion_gate if segmented else gate.stats()
+    }
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import os
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import insert, update, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.types import JSON
+
+from models import Stream, Detection
+from services.detection_rollups import update_rollups
+
+# Rows per INSERT ... VALUES statement (or per COPY chunk)
+BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+# BULK_INSERT_COPY=1 uses Postgres COPY instead of multi-row INSERTs
+USE_COPY = os.getenv("BULK_INSERT_COPY", "0") == "1"
+
+
+def _array_literal(values) -> str:
+    items = []
+    for v in values:
+        items.append('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_value(column, value):
+    # An unquoted empty field is NULL in COPY's csv format
+    if value is None:
+        return ""
+    # Variant types (e.g. ARRAY with a SQLite fallback) wrap the Postgres type in .impl
+    column_type = getattr(column.type, "impl", column.type)
+    if isinstance(column_type, ARRAY):
+        return _array_literal(value)
+    if isinstance(column_type, JSON):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _copy_insert(db: Session, table, rows: list[dict], batch_size: int):
+    columns = [c for c in table.columns if c.name in rows[0]]
+    column_list = ", ".join(c.name for c in columns)
+    # psycopg2 connection behind the session, inside the same transaction
+    raw = db.connection().connection
+
+    for start in range(0, len(rows), batch_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows[start:start + batch_size]:
+            writer.writerow([_copy_value(c, row.get(c.name)) for c in columns])
+        buffer.seek(0)
+        with raw.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def bulk_insert(db: Session, model, rows: list[dict], batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insert plain dict rows for ``model`` in batches, bypassing the ORM unit of work.
+
+    Rows are written in the caller's transaction; the caller commits.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    if USE_COPY and db.get_bind().dialect.name == "postgresql":
+        _copy_insert(db, table, rows, batch_size)
+        return len(rows)
+
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(table).values(rows[start:start + batch_size]))
+    return len(rows)
+
+
+def increment_detection_counts(db: Session, counts: dict[str, int]):
+    """Add to the maintained streams.detection_count so listings never count rows."""
+    if not counts:
+        return
+    db.execute(
+        update(Stream.__table__)
+        .where(Stream.__table__.c.id == bindparam("stream_key"))
+        .values(detection_count=func.coalesce(Stream.__table__.c.detection_count, 0) + bindparam("added")),
+        # A fixed order keeps concurrent writers from deadlocking on each other's stream rows
+        [{"stream_key": stream_id, "added": n} for stream_id, n in sorted(counts.items())],
+    )
+
+
+def insert_detections(db: Session, rows: list[dict], batch_size: int = BATCH_SIZE) -> int:
+    """Insert detection rows and update the stream counters and rollups in the same transaction."""
+    for row in rows:
+        # The rollup bucket must match the stored timestamp
+        row.setdefault("timestamp", datetime.utcnow())
+    inserted = bulk_insert(db, Detection, rows, batch_size)
+    increment_detection_counts(db, Counter(row["stream_id"] for row in rows if row.get("stream_id")))
+    update_rollups(db, rows)
+    return inserted
@@ -0,0 +1,206 @@
+import gzip
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Detection, DetectionRollup
+from services.metrics import metrics
+
+RESOLUTIONS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1)}
+
+# Raw detections older than this are pruned (or archived); 0 keeps them forever
+RETENTION_DAYS = float(os.getenv("DETECTION_RETENTION_DAYS", "0"))
+# Minute rollups older than this are pruned; hour rollups are kept
+MINUTE_ROLLUP_RETENTION_DAYS = float(os.getenv("MINUTE_ROLLUP_RETENTION_DAYS", "30"))
+# DETECTION_ARCHIVE_DIR writes pruned rows to gzipped JSON lines there before deleting them
+ARCHIVE_DIR = os.getenv("DETECTION_ARCHIVE_DIR")
+# Rows deleted per transaction, so pruning never holds long locks
+RETENTION_BATCH_SIZE = int(os.getenv("DETECTION_RETENTION_BATCH_SIZE", "5000"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("DETECTION_RETENTION_INTERVAL_SECONDS", "3600"))
+
+pruned_rows = metrics.counter("vms_retention_pruned_rows_total", "Rows removed by the retention job", ("table",))
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(second=0, microsecond=0)
+
+
+def rollup_rows(detections: list[dict], resolutions=tuple(RESOLUTIONS)) -> list[dict]:
+    """Minute and hour aggregates of detection rows (rows without a stream or timestamp are not rolled up)."""
+    buckets = {}
+    for row in detections:
+        if not row.get("stream_id") or row.get("timestamp") is None:
+            continue
+        confidence = row.get("confidence") or 0.0
+        for resolution in resolutions:
+            key = (resolution, row["stream_id"], row.get("type") or "", bucket_start(row["timestamp"], resolution))
+            entry = buckets.get(key)
+            if entry is None:
+                buckets[key] = {
+                    "resolution": key[0], "stream_id": key[1], "type": key[2], "bucket_start": key[3],
+                    "count": 1, "confidence_sum": confidence, "max_confidence": confidence,
+                }
+            else:
+                entry["count"] += 1
+                entry["confidence_sum"] += confidence
+                entry["max_confidence"] = max(entry["max_confidence"], confidence)
+    # A fixed order keeps concurrent writers from deadlocking on each other's rollup rows
+    return [buckets[key] for key in sorted(buckets)]
+
+
+def _upsert(db: Session, rows: list[dict]):
+    dialect = db.get_bind().dialect.name
+    table = DetectionRollup.__table__
+    statement = (postgresql.insert(table) if dialect == "postgresql" else sqlite.insert(table)).values(rows)
+    greatest = func.greatest if dialect == "postgresql" else func.max  # SQLite's two-argument max()
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key.columns],
+        set_={
+            "count": table.c.count + statement.excluded.count,
+            "confidence_sum": table.c.confidence_sum + statement.excluded.confidence_sum,
+            "max_confidence": greatest(table.c.max_confidence, statement.excluded.max_confidence),
+        },
+    ))
+
+
+def update_rollups(db: Session, detections: list[dict], resolutions=tuple(RESOLUTIONS)):
+    """Fold newly inserted detection rows into the rollups, in the caller's transaction."""
+    rows = rollup_rows(detections, resolutions)
+    if rows:
+        _upsert(db, rows)
+
+
+def rebuild_rollups(db: Session, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """
+    Recompute rollups from the raw rows still in the table (e.g. rows written
+    before rollups existed). Per resolution, only buckets that start at or
+    after the oldest raw row are rebuilt; the bucket holding it may have lost
+    rows to retention, so it and everything older are left alone.
+    """
+    oldest = db.execute(select(func.min(Detection.timestamp))).scalar()
+    if oldest is None:
+        return 0
+
+    starts = {}
+    for resolution, width in RESOLUTIONS.items():
+        start = bucket_start(oldest, resolution)
+        starts[resolution] = start if start == oldest else start + width
+        db.execute(
+            delete(DetectionRollup)
+            .where(DetectionRollup.resolution == resolution)
+            .where(DetectionRollup.bucket_start >= starts[resolution])
+        )
+
+    rows = 0
+    query = (
+        select(Detection.stream_id, Detection.type, Detection.confidence, Detection.timestamp)
+        .where(Detection.timestamp >= min(starts.values()))
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(query).mappings().partitions():
+        partition = [dict(row) for row in partition]
+        for resolution, start in starts.items():
+            update_rollups(db, [row for row in partition if row["timestamp"] >= start], (resolution,))
+        rows += len(partition)
+    db.commit()
+    return rows
+
+
+def _archive(rows: list) -> None:
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    # Appending gzip members keeps one readable file per day
+    path = os.path.join(ARCHIVE_DIR, f"detections-{datetime.utcnow():%Y-%m-%d}.jsonl.gz")
+    with gzip.open(path, "at") as f:
+        for row in rows:
+            f.write(json.dumps({
+                "id": row.id,
+                "stream_id": row.stream_id,
+                "type": row.type,
+                "confidence": row.confidence,
+                "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                "bbox": row.bbox,
+            }) + "\n")
+
+
+def prune_detections(db: Session, older_than: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """
+    Delete (after archiving, with DETECTION_ARCHIVE_DIR) raw detections before
+    ``older_than``, one batch per commit. streams.detection_count is lowered in
+    the same transaction, so it keeps counting retained rows; rollups keep the history.
+    """
+    # bulk_persistence imports this module for update_rollups
+    from services.bulk_persistence import increment_detection_counts
+
+    removed = 0
+    while True:
+        batch = db.execute(
+            select(Detection)
+            .where(Detection.timestamp < older_than)
+            .order_by(Detection.timestamp)
+            .limit(batch_size)
+        ).scalars().all()
+        if not batch:
+            return removed
+
+        if ARCHIVE_DIR:
+            _archive(batch)
+        db.execute(delete(Detection).where(Detection.id.in_([row.id for row in batch])))
+        increment_detection_counts(db, {
+            stream_id: -n for stream_id, n in Counter(row.stream_id for row in batch if row.stream_id).items()
+        })
+        db.commit()
+        db.expunge_all()
+        removed += len(batch)
+        pruned_rows.inc(len(batch), table="detections")
+
+
+def prune_minute_rollups(db: Session, older_than: datetime) -> int:
+    result = db.execute(
+        delete(DetectionRollup)
+        .where(DetectionRollup.resolution == "minute")
+        .where(DetectionRollup.bucket_start < older_than)
+    )
+    db.commit()
+    pruned_rows.inc(result.rowcount, table="detection_rollups")
+    return result.rowcount
+
+
+def run_retention(now: Optional[datetime] = None) -> dict:
+    now = now or datetime.utcnow()
+    db = SessionLocal()
+    try:
+        detections = prune_detections(db, now - timedelta(days=RETENTION_DAYS)) if RETENTION_DAYS > 0 else 0
+        rollups = (
+            prune_minute_rollups(db, now - timedelta(days=MINUTE_ROLLUP_RETENTION_DAYS))
+            if MINUTE_ROLLUP_RETENTION_DAYS > 0 else 0
+        )
+    finally:
+        db.close()
+    if detections or rollups:
+        print(f"🧹 Retention removed {detections} detections and {rollups} minute rollups")
+    return {"detections": detections, "minute_rollups": rollups}
+
+
+def _retention_loop(stop: threading.Event):
+    while not stop.is_set():
+        try:
+            run_retention()
+        except Exception as e:
+            print("❌ Retention run failed:", e)
+        stop.wait(RETENTION_INTERVAL_SECONDS)
+
+
+def start_retention(stop: Optional[threading.Event] = None) -> threading.Event:
+    stop = stop or threading.Event()
+    threading.Thread(target=_retention_loop, args=(stop,), daemon=True, name="detection-retention").start()
+    return stop
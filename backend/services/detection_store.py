@@ -0,0 +1,166 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import VideoDetectionStore
+
+# One .npy file per analyzed video
+STORE_DIR = os.getenv(
+    "DETECTION_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "detections"),
+)
+FORMAT = "npy-v1"
+
+# One record per detected box; sampled frames without detections keep a class_id -1 record
+DETECTION_DTYPE = np.dtype([
+    ("frame", np.int32),
+    ("class_id", np.int16),
+    ("confidence", np.float32),
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+])
+
+
+def pack_detections(detections: list[dict]) -> tuple[np.ndarray, list[str]]:
+    """Per-frame ``{"frame", "objects", "class_ids", "confidences", "boxes"}`` results -> (records, class names)."""
+    class_names: list[str] = []
+    name_ids: dict[str, int] = {}
+    count = sum(max(1, len(item["objects"])) for item in detections)
+    records = np.zeros(count, dtype=DETECTION_DTYPE)
+
+    row = 0
+    for item in detections:
+        objects = item["objects"]
+        if not objects:
+            records[row] = (item["frame"], -1, 0.0, 0.0, 0.0, 0.0, 0.0)
+            row += 1
+            continue
+
+        confidences = item.get("confidences") or [0.0] * len(objects)
+        boxes = item.get("boxes") or [[0.0, 0.0, 0.0, 0.0]] * len(objects)
+        for name, confidence, box in zip(objects, confidences, boxes):
+            if name not in name_ids:
+                name_ids[name] = len(class_names)
+                class_names.append(name)
+            records[row] = (item["frame"], name_ids[name], confidence, *box)
+            row += 1
+
+    return records, class_names
+
+
+def _path(filename: str) -> str:
+    return os.path.join(STORE_DIR, filename)
+
+
+def _publish_on_commit(db: Session, partial: str, final: str):
+    # The file appears under its real name only once the metadata row is committed;
+    # a rollback deletes it. Each listener fires once and is a no-op after the other ran.
+    def publish(session):
+        if os.path.exists(partial):
+            os.replace(partial, final)
+
+    def discard(session):
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    event.listen(db, "after_commit", publish, once=True)
+    event.listen(db, "after_rollback", discard, once=True)
+
+
+def save_detections(db: Session, video_id: str, detections: list[dict], fps: float) -> VideoDetectionStore:
+    """Stage the packed array on disk and add its metadata row to the caller's transaction."""
+    records, class_names = pack_detections(detections)
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    filename = f"{video_id}.npy"
+    partial = _path(f"{filename}.{uuid.uuid4().hex}.part")
+    with open(partial, "wb") as f:
+        np.save(f, records)
+    _publish_on_commit(db, partial, _path(filename))
+
+    return db.merge(VideoDetectionStore(
+        video_id=video_id,
+        filename=filename,
+        format=FORMAT,
+        fps=fps,
+        frames=int(np.unique(records["frame"]).size),
+        detections=int((records["class_id"] >= 0).sum()),
+        class_names=class_names,
+        created_at=datetime.utcnow()
+    ))
+
+
+def load_detections(entry: VideoDetectionStore) -> Optional[np.ndarray]:
+    """Memory-mapped records; nothing is read until the array is used. None if the file is gone."""
+    try:
+        return np.load(_path(entry.filename), mmap_mode="r")
+    except FileNotFoundError:
+        # Row restored without its file, or the store lives on another host's disk
+        print(f"⚠️ Detection store file missing for video {entry.video_id}: {entry.filename}")
+        return None
+
+
+def get_store(db: Session, video_id: str) -> Optional[VideoDetectionStore]:
+    return db.query(VideoDetectionStore).filter(VideoDetectionStore.video_id == video_id).first()
+
+
+def delete_detections(entry: VideoDetectionStore):
+    try:
+        os.remove(_path(entry.filename))
+    except FileNotFoundError:
+        pass
+
+
+def frame_summary(records: np.ndarray, class_names: list[str], top: int) -> tuple[int, list[dict]]:
+    """Sampled frame count and the ``top`` frames with the most objects."""
+    frames, inverse = np.unique(records["frame"], return_inverse=True)
+    per_frame = np.bincount(inverse, weights=records["class_id"] >= 0, minlength=frames.size)
+    # Stable sort keeps the earliest frame first among equal counts
+    best = np.argsort(-per_frame, kind="stable")[:top]
+
+    top_frames = []
+    for index in best.tolist():
+        class_ids = records["class_id"][inverse == index]
+        top_frames.append({
+            "frame": int(frames[index]),
+            "objects": [class_names[c] for c in class_ids.tolist() if c >= 0],
+        })
+    return int(frames.size), top_frames
+
+
+def object_counts(records: np.ndarray, class_names: list[str]) -> dict:
+    """Per-frame sightings by class (not distinct objects; see video_tracks for that)."""
+    class_ids = records["class_id"][records["class_id"] >= 0]
+    counts = np.bincount(class_ids, minlength=len(class_names))
+    return {name: int(n) for name, n in zip(class_names, counts.tolist()) if n}
+
+
+def timeline(records: np.ndarray, class_names: list[str], fps: float, bucket_seconds: float) -> list[dict]:
+    """Objects detected per class in consecutive ``bucket_seconds`` windows."""
+    if records.size == 0:
+        return []
+    bucket_frames = max(1.0, fps * bucket_seconds)
+    buckets = (records["frame"] // bucket_frames).astype(np.int64)
+    last_bucket = int(buckets.max())
+
+    detected = records["class_id"] >= 0
+    # (bucket, class) -> count in one pass
+    flat = buckets[detected] * len(class_names) + records["class_id"][detected]
+    counts = np.bincount(flat, minlength=(last_bucket + 1) * len(class_names))
+    counts = counts.reshape(last_bucket + 1, len(class_names)) if class_names else np.zeros((last_bucket + 1, 0), int)
+
+    return [
+        {
+            "start_seconds": round(bucket * bucket_seconds, 3),
+            "end_seconds": round((bucket + 1) * bucket_seconds, 3),
+            "counts": {name: int(n) for name, n in zip(class_names, row.tolist()) if n},
+        }
+        for bucket, row in enumerate(counts)
+    ]
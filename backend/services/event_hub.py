@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from services.metrics import metrics
+
+# Events buffered per subscriber; a slow client loses its oldest events, never blocks writers
+SUBSCRIBER_BUFFER = int(os.getenv("EVENT_SUBSCRIBER_BUFFER", "100"))
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, stream_id: Optional[str], maxsize: int):
+        self.loop = loop
+        self.stream_id = stream_id
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def wants(self, event: dict) -> bool:
+        return self.stream_id is None or event["data"].get("stream_id") == self.stream_id
+
+    def _offer(self, events: list[dict]):
+        # Runs on the subscriber's event loop
+        for event in events:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(event)
+
+
+class EventHub:
+    """In-process fan-out of new detections and alerts to live subscribers."""
+
+    def __init__(self, buffer_size: int = SUBSCRIBER_BUFFER):
+        self.buffer_size = buffer_size
+        self._subscribers: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, stream_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), stream_id, self.buffer_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, kind: str, rows: list[dict]):
+        """Thread-safe; call after the rows are committed."""
+        if not rows:
+            return
+        events = [{"event": kind, "data": row} for row in rows]
+        self.published += len(events)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            wanted = [e for e in events if subscription.wants(e)]
+            if wanted:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription._offer, wanted)
+                except RuntimeError:
+                    # Loop already closed; the subscriber is gone
+                    self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], default=_json_default)}\n\n"
+
+
+def detection_event(row) -> dict:
+    # Accepts an ORM object or a plain dict row
+    get = row.get if isinstance(row, dict) else lambda key: getattr(row, key)
+    return {key: get(key) for key in ("id", "stream_id", "type", "confidence", "timestamp", "bbox")}
+
+
+def alert_event(row) -> dict:
+    get = row.get if isinstance(row, dict) else lambda key: getattr(row, key)
+    return {key: get(key) for key in ("id", "stream_id", "message", "level", "timestamp")}
+
+
+hub = EventHub()
+metrics.gauge("vms_event_subscribers", "Connected live event subscribers", lambda: hub.stats()["subscribers"])
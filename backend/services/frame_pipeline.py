@@ -0,0 +1,174 @@
+import cv2
+import os
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from services.frame_sampler import AdaptiveSampler, SAMPLING_MODE
+
+# Frame sampling for each consumer of the decoded video
+DETECTION_STRIDE = 30        # every 30th frame goes to YOLO
+CLASSIFICATION_FRAMES = 16   # evenly spaced frames for VideoMAE
+CAPTION_FRAMES = int(os.getenv("CAPTION_FRAMES", "5"))  # evenly spaced frames for BLIP
+
+
+@dataclass
+class DecodedVideo:
+    fps: float
+    total_frames: int
+    classification_frames: list = field(default_factory=list)  # RGB
+    caption_frames: list = field(default_factory=list)         # RGB
+    sampling: dict = field(default_factory=dict)
+
+
+def _evenly_spaced(total: int, count: int) -> list[int]:
+    if total <= 0 or count <= 0:
+        return []
+    return np.linspace(0, total - 1, num=count, dtype=int).tolist()
+
+
+def _pad(frames: list, count: int) -> list:
+    # Container frame counts can over-report; repeat the last frame we got
+    while frames and len(frames) < count:
+        frames.append(frames[-1])
+    return frames
+
+
+def probe_video(video_path: str) -> tuple[float, int]:
+    """Container fps and reported frame count (0 when unknown)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, total_frames
+
+
+def decode_video(
+    video_path: str,
+    detection_stride: int = DETECTION_STRIDE,
+    classification_count: int = CLASSIFICATION_FRAMES,
+    caption_count: int = CAPTION_FRAMES,
+    on_detection_batch: Optional[Callable[[list[int], list], None]] = None,
+    detection_batch_size: int = 16,
+    detection_sampling: str = SAMPLING_MODE,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+) -> DecodedVideo:
+    """
+    Decode the video once and fan frames out to every model.
+
+    Detection frames (BGR) are handed to ``on_detection_batch`` in batches as
+    they are decoded so they never pile up in memory; the few frames needed for
+    classification and captioning are kept and returned as RGB. With
+    ``detection_sampling="adaptive"`` detection frames are chosen by scene
+    change instead of a fixed stride.
+
+    ``start_frame``/``end_frame`` restrict decoding to one segment; frame
+    numbers stay global. Without a detection consumer only the sampled frames
+    are read, by seeking to each one.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    reported_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    classification_indices = set(_evenly_spaced(reported_frames, classification_count))
+    caption_indices = set(_evenly_spaced(reported_frames, caption_count))
+    wants_detection = on_detection_batch is not None and detection_stride > 0
+
+    if not wants_detection and reported_frames > 0 and start_frame == 0 and end_frame is None:
+        return _seek_sampled(cap, fps, reported_frames, classification_indices, caption_indices,
+                             classification_count, caption_count)
+    fallback_stride = detection_stride if detection_stride > 0 else DETECTION_STRIDE
+    sampler = AdaptiveSampler(fps) if wants_detection and detection_sampling == "adaptive" else None
+
+    decoded = DecodedVideo(fps=fps, total_frames=0)
+    batch_numbers, batch_frames = [], []
+    fallback_frames = []  # used when the container does not report a frame count
+    frame_count = start_frame
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    while end_frame is None or frame_count < end_frame:
+        if sampler:
+            # Only a candidate for now; the sampler decides once the frame is decoded
+            is_detection = sampler.is_candidate(frame_count)
+        else:
+            is_detection = wants_detection and frame_count % detection_stride == 0
+        is_classification = frame_count in classification_indices
+        is_caption = frame_count in caption_indices
+        is_fallback = reported_frames <= 0 and frame_count % fallback_stride == 0
+
+        if not (is_detection or is_classification or is_caption or is_fallback):
+            # grab() advances without converting the frame
+            if not cap.grab():
+                break
+            frame_count += 1
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if sampler and is_detection:
+            is_detection = sampler.should_sample(frame_count, frame)
+
+        if is_classification or is_caption or is_fallback:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if is_classification:
+                decoded.classification_frames.append(rgb)
+            if is_caption:
+                decoded.caption_frames.append(rgb)
+            if is_fallback:
+                fallback_frames.append(rgb)
+
+        if is_detection:
+            batch_numbers.append(frame_count)
+            batch_frames.append(frame)
+            if len(batch_frames) >= detection_batch_size:
+                on_detection_batch(batch_numbers, batch_frames)
+                batch_numbers, batch_frames = [], []
+
+        frame_count += 1
+
+    cap.release()
+
+    if batch_frames:
+        on_detection_batch(batch_numbers, batch_frames)
+
+    if reported_frames <= 0 and fallback_frames:
+        decoded.classification_frames = [fallback_frames[i] for i in _evenly_spaced(len(fallback_frames), classification_count)]
+        decoded.caption_frames = [fallback_frames[i] for i in _evenly_spaced(len(fallback_frames), caption_count)]
+
+    decoded.total_frames = frame_count - start_frame
+    if sampler:
+        decoded.sampling = sampler.stats()
+    elif wants_detection:
+        decoded.sampling = {"mode": "fixed", "stride": detection_stride}
+    _pad(decoded.classification_frames, classification_count)
+    _pad(decoded.caption_frames, caption_count)
+    return decoded
+
+
+def _seek_sampled(cap, fps, total_frames, classification_indices, caption_indices, classification_count, caption_count):
+    # Only a handful of frames are needed; seeking beats decoding the whole file
+    decoded = DecodedVideo(fps=fps, total_frames=total_frames)
+    for index in sorted(classification_indices | caption_indices):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if index in classification_indices:
+            decoded.classification_frames.append(rgb)
+        if index in caption_indices:
+            decoded.caption_frames.append(rgb)
+    cap.release()
+
+    _pad(decoded.classification_frames, classification_count)
+    _pad(decoded.caption_frames, caption_count)
+    return decoded
@@ -0,0 +1,86 @@
+import os
+
+import cv2
+import numpy as np
+
+# fixed: every DETECTION_STRIDE-th frame; adaptive: only frames that changed
+SAMPLING_MODE = os.getenv("DETECTION_SAMPLING", "fixed")
+# Never sample closer together / further apart than this, in seconds of video
+MIN_INTERVAL_SECONDS = float(os.getenv("SAMPLING_MIN_INTERVAL", "0.25"))
+MAX_INTERVAL_SECONDS = float(os.getenv("SAMPLING_MAX_INTERVAL", "10"))
+# Change score (0-1) that counts as a new scene
+CHANGE_THRESHOLD = float(os.getenv("SAMPLING_CHANGE_THRESHOLD", "0.06"))
+
+THUMB_SIZE = (64, 36)
+HIST_BINS = 16
+
+
+def describe() -> str:
+    # Used in cache keys so results from different sampling settings never mix
+    if SAMPLING_MODE != "adaptive":
+        return SAMPLING_MODE
+    return f"adaptive({MIN_INTERVAL_SECONDS},{MAX_INTERVAL_SECONDS},{CHANGE_THRESHOLD})"
+
+
+class AdaptiveSampler:
+    """
+    Picks detection frames by how much the scene changed since the last pick.
+
+    Candidates are checked every ``min_interval`` seconds of video. Each one is
+    shrunk to a small grayscale thumbnail and compared with the last sampled
+    frame by mean absolute pixel difference and histogram distance; it is
+    sampled when either exceeds ``threshold`` or ``max_interval`` has passed.
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        min_interval: float = MIN_INTERVAL_SECONDS,
+        max_interval: float = MAX_INTERVAL_SECONDS,
+        threshold: float = CHANGE_THRESHOLD,
+    ):
+        self.check_stride = max(1, round(fps * min_interval))
+        self.max_gap = max(self.check_stride, round(fps * max_interval))
+        self.threshold = threshold
+        self._last_frame = None
+        self._last_thumb = None
+        self._last_hist = None
+        self.candidates = 0
+        self.sampled = 0
+
+    def is_candidate(self, frame_number: int) -> bool:
+        return frame_number % self.check_stride == 0
+
+    def _signature(self, frame):
+        gray = cv2.cvtColor(cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        hist = np.bincount((gray >> 4).ravel(), minlength=HIST_BINS).astype(np.float32)
+        return gray.astype(np.int16), hist / hist.sum()
+
+    def score(self, thumb, hist) -> float:
+        pixel_change = np.abs(thumb - self._last_thumb).mean() / 255.0
+        hist_change = np.abs(hist - self._last_hist).sum() / 2.0
+        return float(max(pixel_change, hist_change))
+
+    def should_sample(self, frame_number: int, frame) -> bool:
+        self.candidates += 1
+        thumb, hist = self._signature(frame)
+
+        sample = (
+            self._last_thumb is None
+            or frame_number - self._last_frame >= self.max_gap
+            or self.score(thumb, hist) >= self.threshold
+        )
+        if sample:
+            self._last_frame = frame_number
+            self._last_thumb, self._last_hist = thumb, hist
+            self.sampled += 1
+        return sample
+
+    def stats(self) -> dict:
+        return {
+            "mode": "adaptive",
+            "check_stride": self.check_stride,
+            "max_gap": self.max_gap,
+            "candidates": self.candidates,
+            "sampled": self.sampled,
+        }
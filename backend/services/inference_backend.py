@@ -0,0 +1,120 @@
+import os
+from types import SimpleNamespace
+
+# fp32: stock PyTorch; int8: PyTorch dynamic quantization of Linear layers;
+# onnx: ONNX Runtime (VideoMAE only; generation models fall back to int8)
+BACKENDS = ("fp32", "int8", "onnx")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "fp32")
+VIDEOMAE_BACKEND = os.getenv("VIDEOMAE_BACKEND", INFERENCE_BACKEND)
+BLIP_BACKEND = os.getenv("BLIP_BACKEND", INFERENCE_BACKEND)
+# Intra-op threads per process (each detection worker, or the API process); 0 keeps the torch default
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))
+# Exported ONNX graphs are reused across restarts
+ONNX_CACHE_DIR = os.getenv(
+    "ONNX_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "onnx"),
+)
+
+
+def resolve(backend: str, supports_onnx: bool = True) -> str:
+    """Backend a model will actually run on; raises ValueError for unknown names."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+    if backend == "onnx" and not supports_onnx:
+        return "int8"
+    return backend
+
+
+def configure_torch(threads: int = TORCH_NUM_THREADS):
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization: Linear weights stored as int8, activations quantized per batch."""
+    import torch
+
+    # fbgemm is x86-only; ARM servers use qnnpack
+    if "fbgemm" not in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = "qnnpack"
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxVideoClassifier:
+    """ONNX Runtime session called like the PyTorch model: ``model(pixel_values=...).logits``."""
+
+    def __init__(self, path: str, config, threads: int = TORCH_NUM_THREADS):
+        import onnxruntime as ort
+        from services.model_registry import _rss_bytes
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        # Measured around the session alone: the fp32 model loaded for export is freed afterwards
+        # and must not count toward this replica's footprint
+        rss_before = _rss_bytes()
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.memory_bytes = max(_rss_bytes() - rss_before, 0) or os.path.getsize(path)
+        self.config = config
+
+    def __call__(self, pixel_values, **_):
+        import torch
+
+        logits = self.session.run(["logits"], {"pixel_values": pixel_values.numpy()})[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def _onnx_path(version: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, version.replace("/", "_").replace("@", "_") + ".onnx")
+
+
+def export_video_classifier(model, version: str) -> str:
+    """Export a VideoMAE classifier to ONNX once per model version and return the file path."""
+    path = _onnx_path(version)
+    if os.path.exists(path):
+        return path
+
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, pixel_values):
+            return self.inner(pixel_values=pixel_values).logits
+
+    config = model.config
+    dummy = torch.zeros(1, config.num_frames, config.num_channels, config.image_size, config.image_size)
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    print(f"📦 Exporting {version} to ONNX")
+    with torch.no_grad():
+        torch.onnx.export(
+            LogitsOnly(model).eval(),
+            (dummy,),
+            path + ".part",
+            input_names=["pixel_values"],
+            output_names=["logits"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=17,
+        )
+    os.replace(path + ".part", path)
+    return path
+
+
+def prepare_video_classifier(model, version: str, backend: str = VIDEOMAE_BACKEND):
+    backend = resolve(backend)
+    if backend == "int8":
+        return quantize_int8(model)
+    if backend == "onnx":
+        return OnnxVideoClassifier(export_video_classifier(model, version), model.config)
+    return model
+
+
+def prepare_generator(model, backend: str = BLIP_BACKEND):
+    # Autoregressive generate() stays in PyTorch, so "onnx" means int8 here
+    if resolve(backend, supports_onnx=False) == "int8":
+        return quantize_int8(model)
+    return model
+
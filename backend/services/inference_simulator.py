@@ -1,58 +1,268 @@
+import argparse
+import json
+import os
 import time
 import threading
 import uuid
+from collections import deque
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from random import choice, uniform
 
-from models import Detection, Alert
+from models import Stream, Alert
 from database import SessionLocal
+from services.bulk_persistence import bulk_insert, insert_detections
+from services.event_hub import hub
 
 TYPES = ["Person", "Vehicle", "Animal"]
 LEVELS = ["low", "medium", "high"]
 
-def simulate_detection():
-    while True:
-        db = SessionLocal()
+# Commit latencies kept for percentiles (most recent samples)
+LATENCY_SAMPLES = 100_000
 
-        try:
-            stream_id = choice(["stream-001", "stream-002"])
-            detection_type = choice(TYPES)
-            confidence = round(uniform(0.7, 0.98), 2)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            bbox = {
+
+@dataclass
+class LoadConfig:
+    streams: int = 2                  # stream-001 .. stream-N
+    events_per_second: float = 0.1    # detections per second across all writers
+    batch_size: int = 1               # detections per commit
+    writers: int = 1                  # concurrent writer threads, each with its own session
+    alerts_per_detection: float = 1.0
+    duration: float = 0.0             # seconds; 0 runs forever
+    burst_multiplier: float = 1.0     # rate multiplier while a burst is active
+    burst_seconds: float = 0.0
+    burst_every: float = 0.0          # seconds between burst starts; 0 disables bursts
+    report_every: float = 0.0         # print an interim report every N seconds; 0 disables
+
+    @classmethod
+    def from_env(cls) -> "LoadConfig":
+        return cls(
+            streams=int(os.getenv("SIMULATOR_STREAMS", "2")),
+            events_per_second=float(os.getenv("SIMULATOR_EVENTS_PER_SECOND", "0.1")),
+            batch_size=int(os.getenv("SIMULATOR_BATCH_SIZE", "1")),
+            writers=int(os.getenv("SIMULATOR_WRITERS", "1")),
+            alerts_per_detection=float(os.getenv("SIMULATOR_ALERTS_PER_DETECTION", "1")),
+        )
+
+    def stream_ids(self) -> list[str]:
+        return [f"stream-{i:03d}" for i in range(1, self.streams + 1)]
+
+    def rate_at(self, elapsed: float) -> float:
+        if self.burst_every > 0 and elapsed % self.burst_every < self.burst_seconds:
+            return self.events_per_second * self.burst_multiplier
+        return self.events_per_second
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.detections = 0
+        self.alerts = 0
+        self.commits = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, detections: int, alerts: int, latency: float):
+        with self.lock:
+            self.detections += detections
+            self.alerts += alerts
+            self.commits += 1
+            self.latencies.append(latency)
+
+    def report(self) -> dict:
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            latencies = sorted(self.latencies)
+            return {
+                "elapsed_seconds": round(elapsed, 2),
+                "detections": self.detections,
+                "alerts": self.alerts,
+                "commits": self.commits,
+                "errors": self.errors,
+                "detections_per_second": round(self.detections / elapsed, 2) if elapsed else 0.0,
+                "rows_per_second": round((self.detections + self.alerts) / elapsed, 2) if elapsed else 0.0,
+                "commit_latency_ms": {
+                    "p50": round(_percentile(latencies, 50) * 1000, 2),
+                    "p95": round(_percentile(latencies, 95) * 1000, 2),
+                    "p99": round(_percentile(latencies, 99) * 1000, 2),
+                    "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+                },
+            }
+
+
+def _ensure_streams(stream_ids: list[str]):
+    db = SessionLocal()
+    try:
+        existing = {sid for (sid,) in db.query(Stream.id).filter(Stream.id.in_(stream_ids))}
+        for sid in stream_ids:
+            if sid not in existing:
+                db.add(Stream(
+                    id=sid,
+                    name=f"Simulated {sid}",
+                    status="active",
+                    thumbnail="/placeholder.svg",
+                    detection_count=0,
+                    uptime="100%",
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _make_batch(config: LoadConfig, stream_ids: list[str]):
+    timestamp = datetime.utcnow()
+    detections, alerts = [], []
+
+    for _ in range(config.batch_size):
+        stream_id = choice(stream_ids)
+        detection_type = choice(TYPES)
+        confidence = round(uniform(0.7, 0.98), 2)
+
+        # 🟡 Detection
+        detections.append({
+            "id": str(uuid.uuid4()),
+            "stream_id": stream_id,
+            "type": detection_type,
+            "confidence": confidence,
+            "timestamp": timestamp,
+            "bbox": {
                 "x": int(uniform(50, 300)),
                 "y": int(uniform(50, 300)),
                 "width": int(uniform(50, 200)),
                 "height": int(uniform(50, 200)),
-            }
+            },
+        })
 
-            # 🟡 Save detection
-            detection = Detection(
-                id=str(uuid.uuid4()),
-                stream_id=stream_id,
-                type=detection_type,
-                confidence=confidence,
-                timestamp=timestamp,
-                bbox=bbox
-            )
-            db.add(detection)
-
-            # 🟢 Save alert
-            alert = Alert(
-                id=str(uuid.uuid4()),
-                stream_id=stream_id,
-                message=f"{detection_type} detected with {int(confidence * 100)}% confidence",
-                level=choice(LEVELS),
-                timestamp="just now"
-            )
-            db.add(alert)
+        # 🟢 Alert
+        if uniform(0, 1) < config.alerts_per_detection:
+            alerts.append({
+                "id": str(uuid.uuid4()),
+                "stream_id": stream_id,
+                "message": f"{detection_type} detected with {int(confidence * 100)}% confidence",
+                "level": choice(LEVELS),
+                "timestamp": timestamp,
+            })
 
-            db.commit()
+    return detections, alerts
 
+
+def _writer(config: LoadConfig, stats: LoadStats, stop: threading.Event, stream_ids: list[str]):
+    # Each writer paces itself to its share of the target rate
+    writer_share = 1.0 / config.writers
+    next_at = time.perf_counter()
+
+    while not stop.is_set():
+        detections, alerts = _make_batch(config, stream_ids)
+
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            insert_detections(db, detections)
+            bulk_insert(db, Alert, alerts)
+            db.commit()
+            stats.record(len(detections), len(alerts), time.perf_counter() - started)
+            hub.publish("detection", detections)
+            hub.publish("alert", alerts)
         except Exception as e:
             print("❌ Error in simulate_detection:", e)
             db.rollback()
+            with stats.lock:
+                stats.errors += 1
         finally:
             db.close()
 
-        time.sleep(10)
+        rate = config.rate_at(time.perf_counter() - stats.started) * writer_share
+        next_at += config.batch_size / rate if rate > 0 else 1.0
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            stop.wait(delay)
+        else:
+            # Behind schedule: the database is the ceiling, don't build up a backlog
+            next_at = time.perf_counter()
+
+
+def run_load(config: LoadConfig, stop: threading.Event = None) -> dict:
+    """Generate detections and alerts at the configured rate and return throughput/latency stats."""
+    stop = stop or threading.Event()
+    stream_ids = config.stream_ids()
+    # Writers survive database errors; so does setup, retrying with backoff until the database is up
+    retry_in = 1.0
+    while not stop.is_set():
+        try:
+            _ensure_streams(stream_ids)
+            break
+        except Exception as e:
+            print(f"❌ Could not set up simulated streams, retrying in {retry_in:.0f}s:", e)
+            stop.wait(retry_in)
+            retry_in = min(retry_in * 2, 30.0)
+
+    stats = LoadStats()
+    threads = [
+        threading.Thread(target=_writer, args=(config, stats, stop, stream_ids), daemon=True, name=f"load-writer-{i}")
+        for i in range(config.writers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    deadline = stats.started + config.duration if config.duration > 0 else None
+    next_report = time.perf_counter() + config.report_every if config.report_every > 0 else None
+    while not stop.is_set():
+        now = time.perf_counter()
+        if deadline and now >= deadline:
+            stop.set()
+            break
+        if next_report and now >= next_report:
+            print("📈", json.dumps(stats.report()))
+            next_report += config.report_every
+        stop.wait(0.5)
+
+    for thread in threads:
+        thread.join()
+    return stats.report()
+
+
+def simulate_detection():
+    # Background demo feed for the dashboard; defaults to one event every 10 seconds
+    run_load(LoadConfig.from_env())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive detection/alert ingest load against the database.")
+    parser.add_argument("--streams", type=int, default=10)
+    parser.add_argument("--eps", type=float, default=100.0, help="target detections per second")
+    parser.add_argument("--batch-size", type=int, default=50, help="detections per commit")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--alerts-per-detection", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--burst-multiplier", type=float, default=1.0)
+    parser.add_argument("--burst-seconds", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=float, default=0.0)
+    parser.add_argument("--report-every", type=float, default=5.0)
+    args = parser.parse_args()
+
+    config = LoadConfig(
+        streams=args.streams,
+        events_per_second=args.eps,
+        batch_size=args.batch_size,
+        writers=args.writers,
+        alerts_per_detection=args.alerts_per_detection,
+        duration=args.duration,
+        burst_multiplier=args.burst_multiplier,
+        burst_seconds=args.burst_seconds,
+        burst_every=args.burst_every,
+        report_every=args.report_every,
+    )
+    print("🚀 Load config:", json.dumps(asdict(config)))
+    print(json.dumps(run_load(config), indent=2))
+
+
+if __name__ == "__main__":
+    main()
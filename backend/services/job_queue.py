@@ -0,0 +1,210 @@
+import os
+import socket
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import update, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import AnalysisJob
+from services.metrics import metrics, analysis_jobs
+
+# At most this many analyses run at once; the rest wait in the queue
+MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "2"))
+# Queued + running jobs allowed before new submissions are rejected
+MAX_QUEUED = int(os.getenv("ANALYSIS_MAX_QUEUED", "50"))
+# Each process refreshes heartbeat_at on the jobs it owns this often
+HEARTBEAT_SECONDS = float(os.getenv("ANALYSIS_HEARTBEAT_SECONDS", "15"))
+# Unfinished jobs whose owner has not sent a heartbeat for this long are taken over
+STALE_SECONDS = float(os.getenv("ANALYSIS_STALE_SECONDS", "60"))
+
+# Identifies this process in analysis_jobs.claimed_by
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+UNFINISHED = ("queued", "running")
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="analysis")
+_lock = threading.Lock()
+_in_flight = 0
+# Resumed jobs that did not fit in the queue at startup; dispatched as slots free up
+_backlog: deque = deque()
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def queue_depth() -> int:
+    return _in_flight + len(_backlog)
+
+
+metrics.gauge("vms_analysis_queue_depth", "Analysis jobs queued or running", queue_depth)
+
+
+def _update_job(job_id: str, **fields):
+    # Status updates use their own session so they commit independently of the results
+    db = SessionLocal()
+    try:
+        db.query(AnalysisJob).filter(AnalysisJob.id == job_id).update(
+            {**fields, "updated_at": datetime.utcnow()}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run_job(job_id: str):
+    global _in_flight
+    from services.analysis_pipeline import analyze_video
+
+    db = SessionLocal()
+    try:
+        job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+        _update_job(job_id, status="running", stage="starting", progress=0.0)
+
+        def on_progress(stage: str, progress: float):
+            _update_job(job_id, stage=stage, progress=progress)
+
+        result = analyze_video(job.video_url, job.video_id, db, on_progress=on_progress)
+        _update_job(job_id, status="completed", stage="done", progress=1.0, result=result)
+        analysis_jobs.inc(status="completed")
+        print(f"✅ Analysis job {job_id} completed")
+
+    except Exception as e:
+        db.rollback()
+        traceback.print_exc()
+        _update_job(job_id, status="failed", error=str(e))
+        analysis_jobs.inc(status="failed")
+        print(f"❌ Analysis job {job_id} failed:", e)
+    finally:
+        db.close()
+        with _lock:
+            _in_flight -= 1
+        _drain_backlog()
+
+
+def _dispatch(job_id: str):
+    global _in_flight
+    with _lock:
+        if _in_flight >= MAX_QUEUED:
+            raise QueueFullError(f"Analysis queue is full ({MAX_QUEUED} jobs)")
+        _in_flight += 1
+    _executor.submit(_run_job, job_id)
+
+
+def _drain_backlog():
+    global _in_flight
+    while True:
+        with _lock:
+            if not _backlog or _in_flight >= MAX_QUEUED:
+                return
+            job_id = _backlog.popleft()
+            _in_flight += 1
+        _executor.submit(_run_job, job_id)
+
+
+def submit_job(db: Session, video_url: str, video_id: str) -> AnalysisJob:
+    if queue_depth() >= MAX_QUEUED:
+        raise QueueFullError(f"Analysis queue is full ({MAX_QUEUED} jobs)")
+
+    now = datetime.utcnow()
+    job = AnalysisJob(
+        id=str(uuid4()),
+        video_id=video_id,
+        video_url=video_url,
+        status="queued",
+        stage="queued",
+        progress=0.0,
+        created_at=now,
+        updated_at=now,
+        claimed_by=INSTANCE_ID,
+        heartbeat_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    try:
+        _dispatch(job.id)
+    except QueueFullError:
+        _update_job(job.id, status="failed", error="Analysis queue is full")
+        analysis_jobs.inc(status="rejected")
+        raise
+    return job
+
+
+def _claim(db: Session, job_id: str, previous_owner) -> bool:
+    # Compare-and-set on claimed_by: when several processes race for a job, only one update matches
+    now = datetime.utcnow()
+    owner = AnalysisJob.claimed_by.is_(None) if previous_owner is None else AnalysisJob.claimed_by == previous_owner
+    result = db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.status.in_(UNFINISHED), owner)
+        .values(claimed_by=INSTANCE_ID, heartbeat_at=now, status="queued", stage="queued", progress=0.0, updated_at=now)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _heartbeat(db: Session):
+    db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.claimed_by == INSTANCE_ID, AnalysisJob.status.in_(UNFINISHED))
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+def resume_unfinished_jobs():
+    """Take over unfinished jobs whose owning process stopped sending heartbeats."""
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - timedelta(seconds=STALE_SECONDS)
+        candidates = (
+            db.query(AnalysisJob.id, AnalysisJob.claimed_by)
+            .filter(AnalysisJob.status.in_(UNFINISHED))
+            .filter(or_(AnalysisJob.heartbeat_at.is_(None), AnalysisJob.heartbeat_at < stale_before))
+            .order_by(AnalysisJob.created_at)
+            .all()
+        )
+        job_ids = [job_id for job_id, owner in candidates if _claim(db, job_id, owner)]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        try:
+            _dispatch(job_id)
+        except QueueFullError:
+            # Stays "queued" and starts when a running job finishes
+            with _lock:
+                _backlog.append(job_id)
+    if job_ids:
+        print(f"🔁 Resumed {len(job_ids)} analysis job(s) ({len(_backlog)} waiting for a free slot)")
+
+
+def _monitor_loop(stop: threading.Event):
+    while True:
+        db = SessionLocal()
+        try:
+            _heartbeat(db)
+        except Exception as e:
+            print("❌ Analysis job heartbeat failed:", e)
+        finally:
+            db.close()
+        try:
+            resume_unfinished_jobs()
+        except Exception as e:
+            print("❌ Resuming analysis jobs failed:", e)
+        if stop.wait(HEARTBEAT_SECONDS):
+            return
+
+
+def start_job_monitor(stop: threading.Event = None) -> threading.Event:
+    """Heartbeat this process's jobs and periodically take over orphaned ones."""
+    stop = stop or threading.Event()
+    threading.Thread(target=_monitor_loop, args=(stop,), daemon=True, name="analysis-job-monitor").start()
+    return stop
@@ -0,0 +1,240 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# METRICS_TIMING_HEADERS=1 adds Server-Timing / X-DB-Queries headers to every response
+TIMING_HEADERS = os.getenv("METRICS_TIMING_HEADERS", "0") == "1"
+
+# Seconds; covers sub-millisecond queries up to multi-minute analyses
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        self.name = name
+        self.help = help
+        self.callback = callback
+
+    def samples(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return
+        yield f"{self.name} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {values[-1]}"
+            plain = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{plain} {_format_value(values[-2])}"
+            yield f"{self.name}_count{plain} {values[-1]}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], float]) -> Gauge:
+        # Re-registering replaces the callback (e.g. after a module reload)
+        with self._lock:
+            self._metrics[name] = Gauge(name, help, callback)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# 📊 Analysis pipeline
+stage_seconds = metrics.histogram(
+    "vms_stage_duration_seconds", "Time spent per analysis stage", ("stage",)
+)
+frames_processed = metrics.counter(
+    "vms_frames_processed_total", "Frames decoded or run through a model", ("stage",)
+)
+model_load_seconds = metrics.histogram(
+    "vms_model_load_seconds", "Time to load a model into memory", ("model",)
+)
+analysis_jobs = metrics.counter(
+    "vms_analysis_jobs_total", "Finished analysis jobs by outcome", ("status",)
+)
+
+# 🌐 HTTP and database
+request_seconds = metrics.histogram(
+    "vms_http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+request_queries = metrics.histogram(
+    "vms_http_request_db_queries", "Database queries issued per HTTP request", ("method", "route"), COUNT_BUCKETS
+)
+db_queries = metrics.counter(
+    "vms_db_queries_total", "Database statements executed", ()
+)
+
+
+# Per-request query counter; a mutable holder so threadpool endpoints and greenlets update the same count
+_request_queries: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("request_queries", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    db_queries.inc()
+    holder = _request_queries.get()
+    if holder is not None:
+        holder[0] += 1
+
+
+def _route_template(scope) -> str:
+    # Use the matched route path so /streams/{stream_id} is one series, not one per id
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request latency, DB queries per request and optional timing headers."""
+
+    def __init__(self, app, timing_headers: bool = TIMING_HEADERS):
+        self.app = app
+        self.timing_headers = timing_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        holder = [0]
+        token = _request_queries.set(holder)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.timing_headers:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", f'app;dur={elapsed_ms:.1f}, db;desc="{holder[0]} queries"'.encode()))
+                    headers.append((b"x-db-queries", str(holder[0]).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            route = _route_template(scope)
+            if route != "/metrics":
+                method = scope["method"]
+                request_seconds.observe(time.perf_counter() - started, method=method, route=route, status=status["code"])
+                request_queries.observe(holder[0], method=method, route=route)
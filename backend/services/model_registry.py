@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from services.metrics import metrics, model_load_seconds
+
+# Loaded models are only evicted while the total is above this budget (0 = unlimited)
+MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+# A model counts as idle once it has not been used for this long
+IDLE_SECONDS = float(os.getenv("MODEL_IDLE_SECONDS", "600"))
+# Comma-separated model names to load at startup, e.g. "yolo,videomae,blip"
+WARMUP_MODELS = [name.strip() for name in os.getenv("MODEL_WARMUP", "").split(",") if name.strip()]
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _tensors(values):
+    for value in values:
+        if isinstance(value, (tuple, list)):
+            yield from _tensors(value)
+        elif hasattr(value, "numel") and hasattr(value, "element_size"):
+            yield value
+
+
+def _module_bytes(obj) -> int:
+    # Tensor bytes of a torch module, or of the modules in a tuple
+    if isinstance(obj, (tuple, list)):
+        return sum(_module_bytes(item) for item in obj)
+    if hasattr(obj, "memory_bytes"):
+        # Non-torch runtimes (e.g. an ONNX Runtime session) report their own footprint
+        return obj.memory_bytes
+    if hasattr(obj, "state_dict") and hasattr(obj, "parameters"):
+        # state_dict also holds the packed int8 weights of quantized layers, which are not parameters;
+        # tied weights appear under several names, so count each storage once
+        tensors = {t.data_ptr(): t for t in _tensors(obj.state_dict().values())}
+        return sum(t.numel() * t.element_size() for t in tensors.values())
+    return 0
+
+
+class ModelEntry:
+    def __init__(self, name: str, loader: Callable):
+        self.name = name
+        self.loader = loader
+        self.model = None
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.last_used = 0.0
+        self.load_seconds: Optional[float] = None
+        self.memory_bytes = 0
+        self.load_count = 0
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb: float = MEMORY_BUDGET_MB, idle_seconds: float = IDLE_SECONDS):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+        self._entries: dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def register(self, name: str, loader: Callable):
+        """Register a zero-argument loader; nothing is loaded until the model is first used."""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = ModelEntry(name, loader)
+            else:
+                self._entries[name].loader = loader
+
+    def _entry(self, name: str) -> ModelEntry:
+        if name not in self._entries:
+            raise KeyError(f"Unknown model: {name}")
+        return self._entries[name]
+
+    def _load(self, entry: ModelEntry):
+        print(f"⏳ Loading model '{entry.name}'")
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        model = entry.loader()
+        entry.load_seconds = time.perf_counter() - started
+        model_load_seconds.observe(entry.load_seconds, model=entry.name)
+        entry.memory_bytes = _module_bytes(model) or max(_rss_bytes() - rss_before, 0)
+        entry.model = model
+        entry.load_count += 1
+        print(f"✅ Loaded model '{entry.name}' in {entry.load_seconds:.1f}s ({entry.memory_bytes / 1e6:.0f} MB)")
+
+    def get(self, name: str):
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.last_used = time.time()
+            model = entry.model
+        self.evict_idle(keep=name)
+        return model
+
+    @contextmanager
+    def use(self, name: str):
+        """Borrow a model; it cannot be evicted while the block is running."""
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.in_use += 1
+            model = entry.model
+        self.evict_idle(keep=name)
+        try:
+            yield model
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def warm_up(self, names: Optional[list[str]] = None) -> dict:
+        for name in names or list(self._entries):
+            self.get(name)
+        return self.stats()
+
+    def unload(self, name: str) -> bool:
+        entry = self._entry(name)
+        with entry.lock:
+            if entry.model is None or entry.in_use:
+                return False
+            entry.model = None
+            entry.memory_bytes = 0
+        print(f"🧹 Unloaded model '{name}'")
+        return True
+
+    def loaded_bytes(self) -> int:
+        return sum(e.memory_bytes for e in self._entries.values() if e.model is not None)
+
+    def evict_idle(self, keep: Optional[str] = None) -> list[str]:
+        """Unload least recently used idle models until the total fits the memory budget."""
+        if not self.memory_budget or self.loaded_bytes() <= self.memory_budget:
+            return []
+
+        now = time.time()
+        candidates = sorted(
+            (
+                e for e in self._entries.values()
+                if e.model is not None and not e.in_use and e.name != keep
+                and now - e.last_used >= self.idle_seconds
+            ),
+            key=lambda e: e.last_used,
+        )
+        evicted = []
+        for entry in candidates:
+            if self.loaded_bytes() <= self.memory_budget:
+                break
+            if self.unload(entry.name):
+                evicted.append(entry.name)
+        return evicted
+
+    def start_reaper(self, interval: float = 60.0):
+        # Idle models are only unloaded on access otherwise
+        if self._reaper is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=loop, daemon=True, name="model-reaper")
+        self._reaper.start()
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "memory_budget_bytes": self.memory_budget,
+            "loaded_bytes": self.loaded_bytes(),
+            "models": {
+                e.name: {
+                    "loaded": e.model is not None,
+                    "in_use": e.in_use,
+                    "memory_bytes": e.memory_bytes,
+                    "load_seconds": e.load_seconds,
+                    "load_count": e.load_count,
+                    "idle_seconds": round(now - e.last_used, 1) if e.last_used else None,
+                }
+                for e in self._entries.values()
+            },
+        }
+
+
+registry = ModelRegistry()
+metrics.gauge("vms_models_loaded_bytes", "Memory held by loaded models", registry.loaded_bytes)
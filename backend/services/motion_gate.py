@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from services.metrics import metrics
+
+# MOTION_GATE=1 skips YOLO on frames without motion; streams can override it individually
+ENABLED = os.getenv("MOTION_GATE", "0") == "1"
+# Motion is measured on a grayscale copy this many pixels wide
+WIDTH = int(os.getenv("MOTION_GATE_WIDTH", "160"))
+# Per-pixel difference (0-255) from the background that counts as changed
+PIXEL_THRESHOLD = float(os.getenv("MOTION_GATE_PIXEL_THRESHOLD", "25"))
+# Fraction of the region-of-interest pixels that must change to run detection
+MIN_AREA = float(os.getenv("MOTION_GATE_MIN_AREA", "0.005"))
+# How quickly the background absorbs slow changes (lighting, shadows)
+LEARNING_RATE = float(os.getenv("MOTION_GATE_LEARNING_RATE", "0.05"))
+# Detection still runs at least this often on a still scene, so stale results get refreshed
+MAX_SKIP_SECONDS = float(os.getenv("MOTION_GATE_MAX_SKIP_SECONDS", "30"))
+
+gate_frames = metrics.counter("vms_motion_gate_frames_total", "Frames checked by the motion gate", ("result",))
+gate_saved_seconds = metrics.counter("vms_motion_gate_saved_seconds_total", "Estimated inference time skipped", ())
+
+
+@dataclass
+class MotionSettings:
+    enabled: bool = ENABLED
+    min_area: float = MIN_AREA
+    # Normalized [x, y, width, height] rectangles; empty watches the whole frame
+    regions: list = field(default_factory=list)
+
+    @classmethod
+    def for_stream(cls, stream) -> "MotionSettings":
+        return cls(
+            enabled=ENABLED if stream.motion_gate_enabled is None else stream.motion_gate_enabled,
+            min_area=MIN_AREA if stream.motion_min_area is None else stream.motion_min_area,
+            regions=stream.motion_regions or [],
+        )
+
+
+def describe(settings: Optional[MotionSettings] = None) -> str:
+    """Gate settings that change video detection results, for cache keys."""
+    settings = settings or MotionSettings()
+    if not settings.enabled:
+        return "off"
+    return f"motion({WIDTH},{PIXEL_THRESHOLD},{settings.min_area},{LEARNING_RATE},{MAX_SKIP_SECONDS})"
+
+
+def _region_mask(shape: tuple, regions: list) -> Optional[np.ndarray]:
+    if not regions:
+        return None
+    height, width = shape
+    mask = np.zeros(shape, dtype=bool)
+    for x, y, w, h in regions:
+        mask[int(y * height):int(np.ceil((y + h) * height)), int(x * width):int(np.ceil((x + w) * width))] = True
+    return mask
+
+
+class MotionGate:
+    """
+    Decides per frame whether detection needs to run, by running-average
+    background subtraction on a small grayscale copy of the frame.
+    """
+
+    def __init__(self, settings: Optional[MotionSettings] = None):
+        self.settings = settings or MotionSettings()
+        self._background = None
+        self._mask = None
+        self._last_detected_at = None
+        self.lock = threading.Lock()
+        self.last_detection = None  # reused for frames the gate skips
+        self.checked = 0
+        self.skipped = 0
+        self.inference_seconds = 0.0
+        self.inferred_frames = 0
+
+    def _gray(self, frame) -> np.ndarray:
+        height, width = frame.shape[:2]
+        size = (WIDTH, max(1, round(height * WIDTH / width)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    def motion(self, frame) -> float:
+        """Fraction of watched pixels that differ from the background; updates the background."""
+        gray = self._gray(frame)
+        if self._background is None or self._background.shape != gray.shape:
+            self._background = gray
+            self._mask = _region_mask(gray.shape, self.settings.regions)
+            return 1.0
+
+        changed = np.abs(gray - self._background) > PIXEL_THRESHOLD
+        self._background += LEARNING_RATE * (gray - self._background)
+        if self._mask is not None:
+            return float(changed[self._mask].mean()) if self._mask.any() else 0.0
+        return float(changed.mean())
+
+    def should_detect(self, frame, at: float) -> bool:
+        """``at`` is the frame time in seconds (video position or wall clock)."""
+        if not self.settings.enabled:
+            return True
+
+        self.checked += 1
+        moving = self.motion(frame) >= self.settings.min_area
+        stale = self._last_detected_at is None or at - self._last_detected_at >= MAX_SKIP_SECONDS
+        if moving or stale or self.last_detection is None:
+            self._last_detected_at = at
+            gate_frames.inc(result="detected")
+            return True
+
+        self.skipped += 1
+        gate_frames.inc(result="skipped")
+        if self.inferred_frames:
+            gate_saved_seconds.inc(self.inference_seconds / self.inferred_frames)
+        return False
+
+    def record_inference(self, seconds: float, frames: int):
+        self.inference_seconds += seconds
+        self.inferred_frames += frames
+
+    def stats(self) -> dict:
+        per_frame = self.inference_seconds / self.inferred_frames if self.inferred_frames else 0.0
+        return {
+            "enabled": self.settings.enabled,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "hit_rate": round(self.skipped / self.checked, 4) if self.checked else 0.0,
+            "saved_seconds": round(self.skipped * per_frame, 3),
+        }
+
+
+def gated_detect(frames: list, times: list[float], gates: list, detect: Callable[[list], list[dict]]) -> list[dict]:
+    """
+    Run ``detect`` only on frames with motion; still frames reuse their gate's
+    previous detections. ``gates`` holds one MotionGate (or None) per frame, so
+    frames from several streams can share a batch.
+    """
+    run = []
+    for frame, at, gate in zip(frames, times, gates):
+        if gate is None:
+            run.append(True)
+            continue
+        with gate.lock:
+            run.append(gate.should_detect(frame, at))
+
+    inferred = [frame for frame, keep in zip(frames, run) if keep]
+    started = time.perf_counter()
+    fresh = iter(detect(inferred) if inferred else [])
+    per_frame = (time.perf_counter() - started) / len(inferred) if inferred else 0.0
+
+    detections = []
+    for keep, gate in zip(run, gates):
+        if keep:
+            detection = next(fresh)
+            if gate is not None:
+                with gate.lock:
+                    gate.last_detection = detection
+                    gate.record_inference(per_frame, 1)
+        else:
+            detection = gate.last_detection
+        detections.append(detection)
+    return detections
+
+
+def merge_stats(parts: list[dict]) -> dict:
+    checked = sum(part["checked"] for part in parts)
+    skipped = sum(part["skipped"] for part in parts)
+    return {
+        "enabled": any(part["enabled"] for part in parts),
+        "checked": checked,
+        "skipped": skipped,
+        "hit_rate": round(skipped / checked, 4) if checked else 0.0,
+        "saved_seconds": round(sum(part["saved_seconds"] for part in parts), 3),
+    }
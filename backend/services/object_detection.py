@@ -1,31 +1,81 @@
-from ultralytics import YOLO
-import cv2
-import tempfile
+import os
 
-# Load model once
-model = YOLO("yolov8n.pt")  # use yolov8s.pt or yolov8m.pt for better accuracy
+from services.frame_pipeline import decode_video, probe_video
+from services.model_registry import registry
+from services.video_cache import video_cache
+from services.metrics import stage_seconds, frames_processed
 
-def run_object_detection(video_path: str):
-    results = []
+# use yolov8s.pt or yolov8m.pt for better accuracy
+YOLO_WEIGHTS = os.getenv("YOLO_WEIGHTS", "yolov8n.pt")
+# Bump YOLO_MODEL_REVISION when the weights file changes under the same name
+MODEL_VERSION = f"{YOLO_WEIGHTS}@{os.getenv('YOLO_MODEL_REVISION', '1')}"
+
+
+def _load_yolo():
+    from ultralytics import YOLO
+    return YOLO(YOLO_WEIGHTS)
+
+
+# Loaded by the registry on first use
+registry.register("yolo", _load_yolo)
 
-    cap = cv2.VideoCapture(video_path)
-    frame_count = 0
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if frame_count % 30 == 0:  # Every ~1 second for 30fps video
-            # Write frame to a temporary image file
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_img:
-                cv2.imwrite(temp_img.name, frame)
-                detect_result = model(temp_img.name)[0]
-                labels = [model.names[int(cls)] for cls in detect_result.boxes.cls]
-                results.append({
-                    "frame": frame_count,
-                    "objects": labels
+# Frames sent to YOLO per forward pass
+BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "16"))
+
+
+def detect_frames(frames: list, batch_size: int = BATCH_SIZE) -> list[dict]:
+    """Run YOLO on in-memory BGR frames and return per-frame boxes, classes and confidences."""
+    detections = []
+
+    with registry.use("yolo") as model, stage_seconds.time(stage="yolo"):
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+            for detect_result in model(batch, verbose=False):
+                boxes = detect_result.boxes
+                class_ids = boxes.cls.int().tolist()
+                detections.append({
+                    "objects": [model.names[cls] for cls in class_ids],
+                    "class_ids": class_ids,
+                    "confidences": [round(conf, 4) for conf in boxes.conf.tolist()],
+                    "boxes": [[round(v, 1) for v in box] for box in boxes.xyxy.tolist()],
                 })
-        frame_count += 1
 
-    cap.release()
+    frames_processed.inc(len(frames), stage="yolo")
+    return detections
+
+
+def run_object_detection(video_path: str, batch_size: int = BATCH_SIZE):
+    with video_cache.local_copy(video_path) as local:
+        return _detect_video(local.path, batch_size)
+
+
+def _detect_video(video_path: str, batch_size: int):
+    from services.segmented_detection import detect_segmented
+
+    # Long videos are split across DETECTION_WORKERS processes when configured
+    segmented = detect_segmented(video_path, batch_size=batch_size)
+    if segmented is not None:
+        return segmented.results
+
+    from services.motion_gate import MotionGate, gated_detect
+
+    results = []
+    gate = MotionGate()
+    fps = probe_video(video_path)[0] if gate.settings.enabled else 1.0
+
+    def on_batch(frame_numbers, frames):
+        detections = gated_detect(
+            frames, [n / fps for n in frame_numbers], [gate] * len(frames),
+            lambda batch: detect_frames(batch, batch_size),
+        )
+        for frame_number, detection in zip(frame_numbers, detections):
+            results.append({"frame": frame_number, **detection})
+
+    decode_video(
+        video_path,
+        classification_count=0,
+        caption_count=0,
+        on_detection_batch=on_batch,
+        detection_batch_size=batch_size,
+    )
     return results
@@ -0,0 +1,158 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from services.frame_pipeline import DETECTION_STRIDE
+from services.frame_sampler import SAMPLING_MODE, MIN_INTERVAL_SECONDS, MAX_INTERVAL_SECONDS
+
+# Minimum box overlap for a detection to continue an existing track
+IOU_THRESHOLD = float(os.getenv("TRACK_IOU_THRESHOLD", "0.3"))
+# A track ends once its object has been missing for this long (never less than the sampling interval)
+MAX_GAP_SECONDS = float(os.getenv("TRACK_MAX_GAP_SECONDS", "3"))
+
+
+@dataclass
+class Track:
+    track_id: int
+    object_class: str
+    class_id: Optional[int]
+    first_frame: int
+    last_frame: int
+    best_confidence: float
+    best_box: list
+    last_box: list
+    observations: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "track_id": self.track_id,
+            "object_class": self.object_class,
+            "first_frame": self.first_frame,
+            "last_frame": self.last_frame,
+            "observations": self.observations,
+            "best_confidence": round(self.best_confidence, 4),
+            "best_box": self.best_box,
+        }
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of xyxy boxes: (N, 4) x (M, 4) -> (N, M)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+class IoUTracker:
+    """
+    Greedy IoU tracker over per-frame YOLO boxes.
+
+    Each detection continues the same-class track whose last box overlaps it
+    most (above ``iou_threshold``); the rest start new tracks. Tracks missing
+    for more than ``max_gap`` frames are closed.
+    """
+
+    def __init__(self, max_gap: int, iou_threshold: float = IOU_THRESHOLD):
+        self.max_gap = max_gap
+        self.iou_threshold = iou_threshold
+        self.active: list[Track] = []
+        self.finished: list[Track] = []
+        self._next_id = 1
+
+    def update(self, frame_number: int, objects: list[str], confidences: list[float], boxes: list, class_ids: Optional[list[int]] = None):
+        # Close tracks that have been gone too long
+        still_active = []
+        for track in self.active:
+            (still_active if frame_number - track.last_frame <= self.max_gap else self.finished).append(track)
+        self.active = still_active
+
+        if not objects:
+            return
+        class_ids = class_ids if class_ids is not None else [None] * len(objects)
+        matched_detections = set()
+
+        if self.active:
+            iou = iou_matrix(
+                np.asarray([t.last_box for t in self.active], dtype=np.float32),
+                np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+            )
+            same_class = np.asarray([t.object_class for t in self.active])[:, None] == np.asarray(objects)[None, :]
+            iou = np.where(same_class, iou, 0.0)
+
+            # Best overlaps first; each track and detection is used once
+            rows, cols = np.nonzero(iou >= self.iou_threshold)
+            order = np.argsort(-iou[rows, cols], kind="stable")
+            matched_tracks = set()
+            for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+                if r in matched_tracks or c in matched_detections:
+                    continue
+                matched_tracks.add(r)
+                matched_detections.add(c)
+                self._extend(self.active[r], frame_number, confidences[c], boxes[c])
+
+        for index, (name, confidence, box, class_id) in enumerate(zip(objects, confidences, boxes, class_ids)):
+            if index in matched_detections:
+                continue
+            self.active.append(Track(
+                track_id=self._next_id,
+                object_class=name,
+                class_id=class_id,
+                first_frame=frame_number,
+                last_frame=frame_number,
+                best_confidence=confidence,
+                best_box=list(box),
+                last_box=list(box),
+            ))
+            self._next_id += 1
+
+    def _extend(self, track: Track, frame_number: int, confidence: float, box: list):
+        track.last_frame = frame_number
+        track.last_box = list(box)
+        track.observations += 1
+        if confidence > track.best_confidence:
+            track.best_confidence = confidence
+            track.best_box = list(box)
+
+    def tracks(self) -> list[Track]:
+        return sorted(self.finished + self.active, key=lambda t: t.track_id)
+
+
+def sampling_gap_seconds(fps: float, mode: str = SAMPLING_MODE) -> float:
+    """Longest stretch of video between two sampled detection frames."""
+    if mode == "adaptive":
+        # Samples land on the candidate grid, so up to one candidate step past max_interval
+        return MAX_INTERVAL_SECONDS + MIN_INTERVAL_SECONDS
+    return DETECTION_STRIDE / fps if fps > 0 else 0.0
+
+
+def track_detections(
+    detections: list[dict],
+    fps: float,
+    max_gap_seconds: float = MAX_GAP_SECONDS,
+    sampling: str = SAMPLING_MODE,
+) -> list[Track]:
+    """Link per-frame ``{"frame", "objects", "confidences", "boxes"}`` results (in frame order) into tracks."""
+    # A still object seen at every sample must not be split into one track per sample
+    gap_seconds = max(max_gap_seconds, sampling_gap_seconds(fps, sampling))
+    tracker = IoUTracker(max_gap=max(1, round(gap_seconds * fps)))
+    for item in detections:
+        objects = item.get("objects") or []
+        boxes = item.get("boxes")
+        if boxes is None:
+            # Results cached before boxes were kept: every object is its own observation
+            boxes = [[0.0, 0.0, 0.0, 0.0]] * len(objects)
+        tracker.update(
+            item["frame"],
+            objects,
+            item.get("confidences") or [1.0] * len(objects),
+            boxes,
+            item.get("class_ids"),
+        )
+    return tracker.tracks()
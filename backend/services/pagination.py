@@ -0,0 +1,59 @@
+import base64
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(stmt, timestamp_col, id_col, limit: int, after: Optional[str] = None, before: Optional[str] = None):
+    """
+    Newest-first keyset pagination over (timestamp, id) for a Select or Query.
+
+    ``after`` continues to older rows than the cursor, ``before`` returns the
+    newer rows just above it. Pair with :func:`keyset_result` on the fetched rows.
+
+    Rows without a timestamp (legacy "just now" values that c7a1d3e95f42 could
+    not parse) have no position in this order and are left out of listings.
+    """
+    key = tuple_(timestamp_col, id_col)
+    stmt = stmt.filter(timestamp_col.isnot(None))
+
+    if before:
+        stmt = stmt.filter(key > decode_cursor(before))
+        return stmt.order_by(timestamp_col.asc(), id_col.asc()).limit(limit + 1)
+
+    if after:
+        stmt = stmt.filter(key < decode_cursor(after))
+    return stmt.order_by(timestamp_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def keyset_result(rows: list, limit: int, after: Optional[str] = None, before: Optional[str] = None):
+    """Returns ``(rows, next_cursor, prev_cursor)``; ``next_cursor`` pages further back in time."""
+    if before:
+        has_newer = len(rows) > limit
+        rows = list(reversed(rows[:limit]))
+        has_older = True
+    else:
+        has_older = len(rows) > limit
+        rows = rows[:limit]
+        has_newer = after is not None
+
+    next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if rows and has_older else None
+    prev_cursor = encode_cursor(rows[0].timestamp, rows[0].id) if rows and has_newer else None
+    return rows, next_cursor, prev_cursor
+
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import AnalysisCacheEntry
+from services.video_cache import video_cache, is_remote
+
+# In-memory tier is bounded by the JSON size of the cached payloads
+MEMORY_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Set RESULT_CACHE_ENABLED=0 to always recompute
+ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") != "0"
+
+CHUNK_SIZE = 1024 * 1024
+
+# (path, size, mtime) -> hash, so unchanged local files are only read once
+_local_hashes = {}
+
+
+def content_hash(video_url: str) -> str:
+    """SHA-256 of the video bytes, read in chunks from a local path or a URL."""
+    if is_remote(video_url):
+        # The video cache hashes while downloading, so this is free once the file is cached
+        cached = video_cache.fetch(video_url)
+        if cached.content_hash:
+            return cached.content_hash
+
+    memo_key = None
+    if os.path.exists(video_url):
+        stat = os.stat(video_url)
+        memo_key = (os.path.abspath(video_url), stat.st_size, stat.st_mtime)
+        if memo_key in _local_hashes:
+            return _local_hashes[memo_key]
+        stream = open(video_url, "rb")
+    else:
+        stream = urllib.request.urlopen(video_url)
+
+    digest = hashlib.sha256()
+    with stream:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    if memo_key:
+        _local_hashes[memo_key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def cache_key(video_hash: str, stage: str, model_version: str) -> str:
+    return f"{video_hash}:{stage}:{model_version}"
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = MEMORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (payload, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, payload):
+        size = len(json.dumps(payload))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (payload, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def get(self, db: Session, video_hash: str, stage: str, model_version: str):
+        if not ENABLED:
+            return None
+        key = cache_key(video_hash, stage, model_version)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        entry = db.query(AnalysisCacheEntry).filter(AnalysisCacheEntry.key == key).first()
+        if entry is None:
+            return None
+        self._remember(key, entry.payload)
+        return entry.payload
+
+    def _remember_on_commit(self, db: Session, key: str, payload):
+        # The memory tier only serves what the database has; a rollback cancels it
+        pending = {"live": True}
+
+        def remember(session):
+            if pending["live"]:
+                pending["live"] = False
+                self._remember(key, payload)
+
+        def discard(session):
+            pending["live"] = False
+
+        event.listen(db, "after_commit", remember, once=True)
+        event.listen(db, "after_rollback", discard, once=True)
+
+    def put(self, db: Session, video_hash: str, stage: str, model_version: str, payload):
+        # The persistent row is committed together with the caller's results
+        if not ENABLED:
+            return
+        key = cache_key(video_hash, stage, model_version)
+        db.merge(AnalysisCacheEntry(
+            key=key,
+            content_hash=video_hash,
+            stage=stage,
+            model_version=model_version,
+            payload=payload,
+            created_at=datetime.utcnow()
+        ))
+        self._remember_on_commit(db, key, payload)
+
+    def invalidate_stale(self, db: Session, current_versions: dict[str, str]) -> int:
+        """Drop persisted entries whose stage was produced by a different model version."""
+        removed = 0
+        for stage, version in current_versions.items():
+            removed += (
+                db.query(AnalysisCacheEntry)
+                .filter(AnalysisCacheEntry.stage == stage, AnalysisCacheEntry.model_version != version)
+                .delete(synchronize_session=False)
+            )
+        db.commit()
+
+        with self._lock:
+            for key in list(self._entries):
+                _, stage, version = key.split(":", 2)
+                if stage in current_versions and current_versions[stage] != version:
+                    self._bytes -= self._entries.pop(key)[1]
+        return removed
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+result_cache = ResultCache()
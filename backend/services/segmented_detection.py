@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import cv2
+
+from services.frame_pipeline import decode_video, probe_video, DETECTION_STRIDE
+from services.motion_gate import MotionGate, gated_detect, merge_stats
+from services.frame_sampler import SAMPLING_MODE
+from services.metrics import stage_seconds, frames_processed
+from services.inference_backend import TORCH_NUM_THREADS
+
+# Processes used for segmented detection of long videos; 1 keeps the single-pass decoder
+DETECTION_WORKERS = int(os.getenv("DETECTION_WORKERS", "1"))
+# Videos are only split when each worker gets at least this much footage (process hand-off and
+# a model load per worker are not worth it for short clips)
+SEGMENT_MIN_SECONDS = float(os.getenv("SEGMENT_MIN_SECONDS", "120"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class SegmentedDetection:
+    fps: float
+    total_frames: int
+    results: list = field(default_factory=list)  # {"frame", "objects", ...} in frame order
+    sampling: dict = field(default_factory=dict)
+    motion_gate: dict = field(default_factory=dict)
+
+
+def plan_segments(total_frames: int, fps: float, workers: int, stride: int = DETECTION_STRIDE) -> list[tuple[int, int]]:
+    """Split [0, total_frames) into up to ``workers`` ranges whose starts are multiples of ``stride``."""
+    min_frames = max(1, int(SEGMENT_MIN_SECONDS * fps))
+    count = min(workers, total_frames // min_frames)
+    if count < 2:
+        return [(0, total_frames)]
+
+    step = total_frames / count
+    # Aligned starts keep the sampled frames identical to a sequential pass
+    bounds = [int(i * step) // stride * stride for i in range(count)] + [total_frames]
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _init_worker(threads: int):
+    # One process per core; keep each one from spawning a thread per core as well
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _detect_segment(video_path: str, start: int, end: int, stride: int, batch_size: int, sampling: str):
+    # Runs in a worker process; its YOLO instance stays loaded between segments
+    from services.object_detection import detect_frames
+
+    results = []
+    gate = MotionGate()
+    fps = probe_video(video_path)[0] if gate.settings.enabled else 1.0
+
+    def on_batch(frame_numbers, frames):
+        detections = gated_detect(
+            frames, [n / fps for n in frame_numbers], [gate] * len(frames),
+            lambda batch: detect_frames(batch, batch_size),
+        )
+        for frame_number, detection in zip(frame_numbers, detections):
+            results.append({"frame": frame_number, **detection})
+
+    decoded = decode_video(
+        video_path,
+        detection_stride=stride,
+        classification_count=0,
+        caption_count=0,
+        on_detection_batch=on_batch,
+        detection_batch_size=batch_size,
+        detection_sampling=sampling,
+        start_frame=start,
+        end_frame=end,
+    )
+    return results, decoded.total_frames, decoded.sampling, gate.stats()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already holds torch threads can deadlock
+            # TORCH_NUM_THREADS pins the per-worker count; otherwise cores are shared evenly
+            threads = TORCH_NUM_THREADS or max(1, (os.cpu_count() or workers) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _merge_sampling(parts: list[dict]) -> dict:
+    merged = dict(parts[0])
+    for key in ("candidates", "sampled"):
+        if key in merged:
+            merged[key] = sum(part[key] for part in parts)
+    merged["segments"] = len(parts)
+    return merged
+
+
+def detect_segmented(
+    video_path: str,
+    workers: int = DETECTION_WORKERS,
+    stride: int = DETECTION_STRIDE,
+    batch_size: int = 16,
+    sampling: str = SAMPLING_MODE,
+) -> Optional[SegmentedDetection]:
+    """
+    Decode and detect time ranges of one video in parallel processes.
+
+    Fixed-stride results match a single pass exactly; adaptive sampling
+    restarts per segment, so each segment's first candidate is always sampled.
+    Returns None when the video is too short to split or its frame count is
+    unknown, in which case callers fall back to the single-pass decoder.
+    """
+    if workers < 2:
+        return None
+
+    fps, total_frames = probe_video(video_path)
+    segments = plan_segments(total_frames, fps, workers, stride) if total_frames > 0 else []
+    if len(segments) < 2:
+        return None
+
+    print(f"🧩 Detecting {len(segments)} segments of {video_path} across {workers} workers")
+    started = time.perf_counter()
+    pool = _get_pool(workers)
+    futures = [
+        # The last segment reads to the end in case the container under-reports its length
+        pool.submit(_detect_segment, video_path, start, None if end == total_frames else end, stride, batch_size, sampling)
+        for start, end in segments
+    ]
+
+    merged = SegmentedDetection(fps=fps, total_frames=0)
+    sampling_parts, gate_parts = [], []
+    # Segments are submitted in order and frame numbers are global, so concatenation keeps frame order
+    for future in futures:
+        results, frames, segment_sampling, segment_gate = future.result()
+        merged.results.extend(results)
+        merged.total_frames += frames
+        sampling_parts.append(segment_sampling)
+        gate_parts.append(segment_gate)
+
+    merged.sampling = _merge_sampling(sampling_parts)
+    merged.motion_gate = merge_stats(gate_parts)
+    # Worker processes have their own metrics; record the parallel stage as a whole here
+    stage_seconds.observe(time.perf_counter() - started, stage="segmented_detection")
+    frames_processed.inc(merged.total_frames, stage="decode")
+    return merged
@@ -0,0 +1,337 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+import cv2
+import numpy as np
+
+from database import SessionLocal
+from models import Stream
+from services.object_detection import detect_frames
+from services.bulk_persistence import insert_detections
+from services.event_hub import hub, detection_event
+from services.metrics import metrics
+from services.motion_gate import MotionGate, MotionSettings, gated_detect
+
+# Shared YOLO workers for all streams
+DETECTOR_WORKERS = int(os.getenv("INGEST_DETECTOR_WORKERS", "2"))
+# Frames from different streams run through YOLO together
+DETECTOR_BATCH_SIZE = int(os.getenv("INGEST_DETECTOR_BATCH_SIZE", "8"))
+# Frames kept per stream; older ones are dropped when the detectors fall behind
+BUFFER_SIZE = int(os.getenv("INGEST_BUFFER_SIZE", "1"))
+# Detections below this confidence are not stored
+MIN_CONFIDENCE = float(os.getenv("INGEST_MIN_CONFIDENCE", "0.5"))
+RECONNECT_SECONDS = float(os.getenv("INGEST_RECONNECT_SECONDS", "5"))
+
+
+class RateMeter:
+    def __init__(self, window: int = 50):
+        self._times = deque(maxlen=window)
+
+    def tick(self, now: float):
+        self._times.append(now)
+
+    def rate(self) -> float:
+        if len(self._times) < 2 or self._times[-1] == self._times[0]:
+            return 0.0
+        return (len(self._times) - 1) / (self._times[-1] - self._times[0])
+
+
+class LatestFrameBuffer:
+    """Bounded per-stream buffer; overflowing or superseded frames are counted as dropped."""
+
+    def __init__(self, maxlen: int = BUFFER_SIZE):
+        self._frames = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, frame_number: int, frame, captured_at: float):
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append((frame_number, frame, captured_at))
+
+    def pop_latest(self):
+        with self._lock:
+            if not self._frames:
+                return None
+            latest = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            return latest
+
+
+class SyntheticSource:
+    """test://?fps=15&width=640&height=360 — a moving box, for running without cameras."""
+
+    def __init__(self, source: str):
+        params = {k: v[0] for k, v in parse_qs(urlparse(source).query).items()}
+        self.fps = float(params.get("fps", 15))
+        self.width = int(params.get("width", 640))
+        self.height = int(params.get("height", 360))
+        self._index = 0
+
+    def isOpened(self) -> bool:
+        return True
+
+    def get(self, prop):
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0
+
+    def read(self):
+        frame = np.full((self.height, self.width, 3), 40, dtype=np.uint8)
+        x = (self._index * 4) % max(self.width - 80, 1)
+        frame[self.height // 3:self.height // 3 + 80, x:x + 80] = (0, 200, 255)
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def _open_source(source: str):
+    if source.startswith("test://"):
+        return SyntheticSource(source)
+    return cv2.VideoCapture(source)
+
+
+class StreamReader(threading.Thread):
+    """Reads one source as fast as it produces frames and keeps only the newest."""
+
+    def __init__(self, stream_id: str, source: str, on_frame):
+        super().__init__(daemon=True, name=f"ingest-{stream_id}")
+        self.stream_id = stream_id
+        self.source = source
+        self.buffer = LatestFrameBuffer()
+        self.on_frame = on_frame
+        self.stop_event = threading.Event()
+        self.read_rate = RateMeter()
+        self.frames_read = 0
+        self.error = None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            cap = _open_source(self.source)
+            if not cap.isOpened():
+                self.error = f"Could not open {self.source}"
+                print(f"❌ [{self.stream_id}] {self.error}")
+                self.stop_event.wait(RECONNECT_SECONDS)
+                continue
+
+            # Files and synthetic sources are paced to real time; cameras pace themselves
+            is_live = self.source.startswith(("rtsp://", "rtmp://", "http://", "https://"))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_interval = 0.0 if is_live else 1.0 / fps
+            self.error = None
+
+            next_at = time.perf_counter()
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                now = time.time()
+                self.frames_read += 1
+                self.read_rate.tick(now)
+                self.buffer.put(self.frames_read, frame, now)
+                self.on_frame(self.stream_id)
+
+                if frame_interval:
+                    next_at += frame_interval
+                    delay = next_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_at = time.perf_counter()
+
+            cap.release()
+            if not self.stop_event.is_set():
+                # End of file loops; a dropped camera reconnects
+                self.stop_event.wait(0 if not is_live else RECONNECT_SECONDS)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class StreamStats:
+    def __init__(self):
+        self.processed = 0
+        self.detections = 0
+        self.detect_rate = RateMeter()
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+
+class IngestEngine:
+    def __init__(self, workers: int = DETECTOR_WORKERS, batch_size: int = DETECTOR_BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.readers: dict[str, StreamReader] = {}
+        self.stats_by_stream: dict[str, StreamStats] = {}
+        self.gates: dict[str, MotionGate] = {}
+        self._ready = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # --- readers -------------------------------------------------------
+
+    def _notify(self, stream_id: str):
+        # Each stream is queued at most once; its buffer always holds the newest frame
+        with self._lock:
+            if stream_id in self._pending:
+                return
+            self._pending.add(stream_id)
+        self._ready.put(stream_id)
+
+    def start_stream(self, stream_id: str, source: str, motion: Optional[MotionSettings] = None):
+        self._start_workers()
+        self.stop_stream(stream_id)
+        reader = StreamReader(stream_id, source, self._notify)
+        self.readers[stream_id] = reader
+        self.stats_by_stream.setdefault(stream_id, StreamStats())
+        self.gates[stream_id] = MotionGate(motion)
+        reader.start()
+        print(f"📡 Ingest started for {stream_id} ({source})")
+
+    def stop_stream(self, stream_id: str) -> bool:
+        reader = self.readers.pop(stream_id, None)
+        if reader is None:
+            return False
+        reader.stop()
+        print(f"🛑 Ingest stopped for {stream_id}")
+        return True
+
+    def start_all(self):
+        db = SessionLocal()
+        try:
+            streams = db.query(Stream).filter(Stream.source_url.isnot(None), Stream.status == "active").all()
+            sources = [(s.id, s.source_url, MotionSettings.for_stream(s)) for s in streams]
+        finally:
+            db.close()
+        for stream_id, source, motion in sources:
+            self.start_stream(stream_id, source, motion)
+
+    def stop_all(self):
+        for stream_id in list(self.readers):
+            self.stop_stream(stream_id)
+
+    # --- detectors -----------------------------------------------------
+
+    def _start_workers(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._detector_loop, daemon=True, name=f"ingest-detector-{i}")
+            thread.start()
+            self._threads.append(thread)
+
+    def _take_batch(self) -> list:
+        stream_ids = [self._ready.get()]
+        while len(stream_ids) < self.batch_size:
+            try:
+                stream_ids.append(self._ready.get_nowait())
+            except queue.Empty:
+                break
+
+        batch = []
+        with self._lock:
+            self._pending.difference_update(stream_ids)
+        for stream_id in stream_ids:
+            reader = self.readers.get(stream_id)
+            item = reader.buffer.pop_latest() if reader else None
+            if item is not None:
+                batch.append((stream_id, *item))
+        return batch
+
+    def _detector_loop(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                # Streams whose view has not changed reuse their last detections instead of running YOLO
+                detections = gated_detect(
+                    [frame for _, _, frame, _ in batch],
+                    [captured_at for _, _, _, captured_at in batch],
+                    [self.gates.get(stream_id) for stream_id, _, _, _ in batch],
+                    lambda frames: detect_frames(frames, self.batch_size),
+                )
+                self._save(batch, detections)
+            except Exception as e:
+                print("❌ Error in ingest detector:", e)
+
+    def _save(self, batch: list, detections: list[dict]):
+        now = time.time()
+        timestamp = datetime.utcnow()
+        rows = []
+
+        for (stream_id, _, frame, captured_at), detection in zip(batch, detections):
+            stats = self.stats_by_stream.setdefault(stream_id, StreamStats())
+            stats.processed += 1
+            stats.detect_rate.tick(now)
+            stats.last_lag = now - captured_at
+            stats.max_lag = max(stats.max_lag, stats.last_lag)
+
+            for name, confidence, (x1, y1, x2, y2) in zip(
+                detection["objects"], detection["confidences"], detection["boxes"]
+            ):
+                if confidence < MIN_CONFIDENCE:
+                    continue
+                stats.detections += 1
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "stream_id": stream_id,
+                    "type": name,
+                    "confidence": round(confidence, 2),
+                    "timestamp": timestamp,
+                    "bbox": {"x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1}
+                })
+
+        if not rows:
+            return
+        db = SessionLocal()
+        try:
+            insert_detections(db, rows)
+            db.commit()
+            hub.publish("detection", [detection_event(row) for row in rows])
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # --- reporting -----------------------------------------------------
+
+    def stats(self) -> dict:
+        streams = {}
+        for stream_id, reader in self.readers.items():
+            stats = self.stats_by_stream.get(stream_id, StreamStats())
+            streams[stream_id] = {
+                "source": reader.source,
+                "running": reader.is_alive(),
+                "error": reader.error,
+                "read_fps": round(reader.read_rate.rate(), 2),
+                "detect_fps": round(stats.detect_rate.rate(), 2),
+                "frames_read": reader.frames_read,
+                "frames_processed": stats.processed,
+                "frames_dropped": reader.buffer.dropped,
+                "detections": stats.detections,
+                "lag_seconds": round(stats.last_lag, 3),
+                "max_lag_seconds": round(stats.max_lag, 3),
+                "motion_gate": self.gates[stream_id].stats() if stream_id in self.gates else None,
+            }
+        return {
+            "detector_workers": self.workers,
+            "queue_depth": self._ready.qsize(),
+            "streams": streams,
+        }
+
+
+engine = IngestEngine()
+metrics.gauge("vms_ingest_streams", "Live streams being ingested", lambda: len(engine.readers))
+metrics.gauge("vms_ingest_queue_depth", "Streams with a frame waiting for a detector", lambda: engine._ready.qsize())
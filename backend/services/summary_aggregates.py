@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.detection_store import get_store, load_detections, frame_summary, object_counts as store_object_counts
+from models import (
+    VideoDetection,
+    VideoTrack,
+    VideoClassification,
+    VideoAlert,
+    VideoSummary,
+    VideoSummaryAggregate
+)
+
+TOP_FRAMES = 5
+
+
+def build_summary(
+    detections: list[dict],
+    classification: list,
+    alerts: list[dict],
+    summary_text: str,
+    tracks: Optional[list[dict]] = None,
+) -> dict:
+    """
+    Shape served by GET /ai/summary, from per-frame {"frame", "objects"} results.
+
+    With ``tracks`` object counts are distinct tracked objects; without them
+    (videos analyzed before tracking) every per-frame sighting is counted.
+    """
+    object_counts = {}
+    if tracks is not None:
+        for track in tracks:
+            object_counts[track["object_class"]] = object_counts.get(track["object_class"], 0) + 1
+    else:
+        for d in detections:
+            for obj in d["objects"]:
+                object_counts[obj] = object_counts.get(obj, 0) + 1
+
+    top_frames = sorted(
+        ({"frame": d["frame"], "objects": d["objects"]} for d in detections),
+        key=lambda x: len(x["objects"]),
+        reverse=True
+    )[:TOP_FRAMES]
+
+    return {
+        "total_frames": len({d["frame"] for d in detections}),
+        "object_counts": object_counts,
+        "top_frames": top_frames,
+        "classification": classification,
+        "alerts": [
+            {
+                "type": a["type"],
+                "confidence": a["confidence"],
+                "timestamp": a["timestamp"].isoformat() if isinstance(a["timestamp"], datetime) else a["timestamp"]
+            }
+            for a in alerts
+        ],
+        "summary_text": summary_text
+    }
+
+
+def save_summary(db: Session, video_id: str, summary: dict):
+    # Added to the caller's transaction
+    db.merge(VideoSummaryAggregate(
+        video_id=video_id,
+        total_frames=summary["total_frames"],
+        object_counts=summary["object_counts"],
+        top_frames=summary["top_frames"],
+        classification=summary["classification"],
+        alerts=summary["alerts"],
+        summary_text=summary["summary_text"],
+        updated_at=datetime.utcnow()
+    ))
+
+
+def _summary_from_store(db: Session, video_id: str) -> Optional[dict]:
+    store = get_store(db, video_id)
+    if store is None:
+        return None
+    records = load_detections(store)
+    if records is None:
+        return None
+    total_frames, top_frames = frame_summary(records, store.class_names, TOP_FRAMES)
+    return {
+        "total_frames": total_frames,
+        "top_frames": top_frames,
+        "object_counts": store_object_counts(records, store.class_names),
+    }
+
+
+def rebuild_summary(db: Session, video_id: str) -> Optional[dict]:
+    """Recompute the aggregate from the per-video result tables (for videos analyzed before it existed)."""
+    classification = db.query(VideoClassification.labels).filter_by(video_id=video_id).first()
+    alerts = (
+        db.query(VideoAlert.alert_type, VideoAlert.confidence, VideoAlert.timestamp)
+        .filter_by(video_id=video_id)
+        .all()
+    )
+    summary_entry = db.query(VideoSummary.summary_text).filter_by(video_id=video_id).first()
+    tracks = (
+        db.query(VideoTrack.object_class)
+        .filter(VideoTrack.video_id == video_id)
+        .all()
+    )
+
+    # Packed detection store: array operations instead of loading per-frame rows
+    frames = _summary_from_store(db, video_id)
+    if frames is not None:
+        summary = build_summary(
+            [],
+            classification.labels if classification else [],
+            [{"type": t, "confidence": c, "timestamp": ts} for t, c, ts in alerts],
+            summary_entry.summary_text if summary_entry else "",
+            [{"object_class": object_class} for (object_class,) in tracks]
+        )
+        summary.update(total_frames=frames["total_frames"], top_frames=frames["top_frames"])
+        if not tracks:
+            summary["object_counts"] = frames["object_counts"]
+        save_summary(db, video_id, summary)
+        db.commit()
+        return summary
+
+    rows = (
+        db.query(VideoDetection.frame_number, VideoDetection.detected_objects)
+        .filter(VideoDetection.video_id == video_id)
+        .all()
+    )
+    if not rows and not tracks:
+        return None
+
+    summary = build_summary(
+        [{"frame": frame, "objects": objects} for frame, objects in rows],
+        classification.labels if classification else [],
+        [{"type": t, "confidence": c, "timestamp": ts} for t, c, ts in alerts],
+        summary_entry.summary_text if summary_entry else "",
+        [{"object_class": object_class} for (object_class,) in tracks] if tracks else None
+    )
+    save_summary(db, video_id, summary)
+    db.commit()
+    return summary
+
+
+def _serialize(aggregate: VideoSummaryAggregate) -> dict:
+    return {
+        "total_frames": aggregate.total_frames,
+        "object_counts": aggregate.object_counts,
+        "top_frames": aggregate.top_frames,
+        "classification": aggregate.classification,
+        "alerts": aggregate.alerts,
+        "summary_text": aggregate.summary_text
+    }
+
+
+def get_summary(db: Session, video_id: str) -> Optional[dict]:
+    aggregate = db.query(VideoSummaryAggregate).filter(VideoSummaryAggregate.video_id == video_id).first()
+    if aggregate is None:
+        return rebuild_summary(db, video_id)
+    return _serialize(aggregate)
+
+
+async def get_summary_async(db: AsyncSession, video_id: str) -> Optional[dict]:
+    aggregate = await db.get(VideoSummaryAggregate, video_id)
+    if aggregate is None:
+        # Rare legacy path; reuse the sync rebuild on the async session's connection
+        return await db.run_sync(rebuild_summary, video_id)
+    return _serialize(aggregate)
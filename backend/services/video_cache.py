@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+from services.metrics import metrics
+
+# Downloaded source videos live here, named by content hash
+CACHE_DIR = os.getenv("VIDEO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vms-video-cache"))
+# Least recently used videos are deleted once the directory grows past this
+MAX_BYTES = int(float(os.getenv("VIDEO_CACHE_MAX_GB", "10")) * 1024 ** 3)
+# Set VIDEO_CACHE_ENABLED=0 to decode remote URLs directly
+ENABLED = os.getenv("VIDEO_CACHE_ENABLED", "1") != "0"
+
+CHUNK_SIZE = 1024 * 1024
+INDEX_FILE = "index.json"
+
+downloads = metrics.counter("vms_video_cache_requests_total", "Remote video lookups by result", ("result",))
+
+
+@dataclass
+class LocalVideo:
+    path: str
+    content_hash: Optional[str] = None  # known for downloaded files; None for paths used as-is
+
+
+def is_remote(source: str) -> bool:
+    return urlparse(source).scheme in ("http", "https")
+
+
+def _validator(url: str) -> Optional[str]:
+    # ETag (or Last-Modified) tells us whether our copy of the URL is still current
+    request = urllib.request.Request(url, method="HEAD")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.headers.get("ETag") or response.headers.get("Last-Modified")
+    except Exception:
+        return None
+
+
+class VideoCache:
+    """Content-addressed disk cache of remote source videos, evicted LRU under a byte budget."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._url_locks: dict[str, threading.Lock] = {}
+        self._pinned: dict[str, int] = {}  # path -> active users; never evicted
+        self._index: Optional[dict] = None  # "url|validator" -> content hash
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                with open(os.path.join(self.directory, INDEX_FILE)) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self._index, f)
+        os.replace(path + ".tmp", path)
+
+    def _path_for(self, video_hash: str, url: str) -> str:
+        extension = os.path.splitext(urlparse(url).path)[1] or ".mp4"
+        return os.path.join(self.directory, video_hash + extension)
+
+    def _download(self, url: str) -> tuple[str, str]:
+        # Stream to a temp file while hashing; the final name is the content hash
+        digest = hashlib.sha256()
+        fd, partial = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out, urllib.request.urlopen(url) as response:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            video_hash = digest.hexdigest()
+            path = self._path_for(video_hash, url)
+            os.replace(partial, path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return path, video_hash
+
+    def _pin(self, path: str):
+        self._pinned[path] = self._pinned.get(path, 0) + 1
+
+    def fetch(self, url: str, pin: bool = False) -> LocalVideo:
+        """Local copy of ``url``, downloading it at most once per ETag."""
+        if not ENABLED or not is_remote(url):
+            return LocalVideo(path=url)
+
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        # One download per URL even when several jobs ask for it at once
+        with url_lock:
+            validator = _validator(url)
+            key = f"{url}|{validator}" if validator else None
+
+            with self._lock:
+                video_hash = self._load_index().get(key) if key else None
+                path = self._path_for(video_hash, url) if video_hash else None
+                if path and os.path.exists(path):
+                    os.utime(path)  # mtime is the LRU clock
+                    if pin:
+                        self._pin(path)
+                    downloads.inc(result="hit")
+                    return LocalVideo(path=path, content_hash=video_hash)
+
+            print(f"⬇️ Caching {url}")
+            downloads.inc(result="miss")
+            path, video_hash = self._download(url)
+
+            with self._lock:
+                # Without a validator the URL is re-downloaded next time; identical bytes still share one file
+                if key:
+                    self._load_index()[key] = video_hash
+                    self._save_index()
+                if pin:
+                    self._pin(path)
+            self.evict(keep=path)
+            return LocalVideo(path=path, content_hash=video_hash)
+
+    @contextmanager
+    def local_copy(self, url: str):
+        """Fetch ``url`` and keep the file from being evicted while the block runs."""
+        video = self.fetch(url, pin=True)
+        if video.content_hash is None:
+            # Local paths and uncached URLs are not ours to evict
+            yield video
+            return
+        try:
+            yield video
+        finally:
+            with self._lock:
+                self._pinned[video.path] -= 1
+                if not self._pinned[video.path]:
+                    del self._pinned[video.path]
+
+    def _files(self) -> list[tuple[str, int, float]]:
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name != INDEX_FILE and not entry.name.endswith((".part", ".tmp")):
+                stat = entry.stat()
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used videos until the cache fits its budget."""
+        with self._lock:
+            files = sorted(self._files(), key=lambda f: f[2])
+            total = sum(size for _, size, _ in files)
+            removed = []
+            for path, size, _ in files:
+                if total <= self.max_bytes:
+                    break
+                if path == keep or path in self._pinned:
+                    continue
+                os.remove(path)
+                total -= size
+                removed.append(os.path.splitext(os.path.basename(path))[0])
+
+            if removed:
+                self._index = {key: h for key, h in self._load_index().items() if h not in removed}
+                self._save_index()
+                print(f"🧹 Evicted {len(removed)} cached video(s)")
+        return len(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            files = self._files()
+            return {
+                "directory": self.directory,
+                "videos": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "pinned": len(self._pinned),
+            }
+
+
+video_cache = VideoCache()
+metrics.gauge("vms_video_cache_bytes", "Bytes of source video cached on disk", lambda: video_cache.stats()["bytes"])
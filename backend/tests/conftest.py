@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Tests that touch the database get a throwaway SQLite file; set before database is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='vms-tests-')}/test.db")
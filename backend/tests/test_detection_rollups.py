@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from database import Base, SessionLocal, engine
+import models  # noqa: F401  registers tables
+from models import Detection, DetectionRollup, Stream
+from services.bulk_persistence import insert_detections
+from services.detection_rollups import prune_detections, rebuild_rollups
+
+START = datetime(2026, 1, 1, 10, 0, 0)
+
+
+def _counts(db, resolution: str) -> dict:
+    rows = db.query(DetectionRollup).filter(DetectionRollup.resolution == resolution).all()
+    return {row.bucket_start: row.count for row in rows}
+
+
+def test_rebuild_after_prune_keeps_pruned_history():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(DetectionRollup).delete()
+        db.query(Detection).delete()
+        db.merge(Stream(id="rollup-stream", name="Rollups", detection_count=0))
+        db.commit()
+
+        # One detection every minute from 10:00:30 to 10:59:30
+        insert_detections(db, [
+            {
+                "id": f"rollup-{i}",
+                "stream_id": "rollup-stream",
+                "type": "Person",
+                "confidence": 0.5,
+                "timestamp": START + timedelta(minutes=i, seconds=30),
+                "bbox": {},
+            }
+            for i in range(60)
+        ])
+        db.commit()
+
+        assert prune_detections(db, START + timedelta(minutes=30)) == 30
+        rebuild_rollups(db)
+
+        assert _counts(db, "hour") == {START: 60}
+        minutes = _counts(db, "minute")
+        assert len(minutes) == 60
+        assert all(count == 1 for count in minutes.values())
+    finally:
+        db.close()
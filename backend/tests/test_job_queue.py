@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from database import Base, SessionLocal, engine
+import models  # noqa: F401  registers tables
+from models import AnalysisJob
+from services import job_queue
+
+
+def _job(db, job_id: str, owner):
+    now = datetime.utcnow()
+    db.merge(AnalysisJob(
+        id=job_id, video_id="v", video_url="u", status="running", stage="detection",
+        created_at=now, updated_at=now, claimed_by=owner, heartbeat_at=now,
+    ))
+    db.commit()
+
+
+def test_only_one_process_claims_an_orphaned_job():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        _job(db, "claim-job", "dead-host:1:abc")
+        # Two processes that both saw the dead owner race for the job; the second update matches nothing
+        assert job_queue._claim(db, "claim-job", "dead-host:1:abc")
+        assert not job_queue._claim(db, "claim-job", "dead-host:1:abc")
+
+        job = db.get(AnalysisJob, "claim-job")
+        db.refresh(job)
+        assert job.claimed_by == job_queue.INSTANCE_ID
+        assert job.status == "queued"
+    finally:
+        db.close()
+
+
+def test_finished_jobs_are_never_claimed():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        _job(db, "done-job", None)
+        db.query(AnalysisJob).filter(AnalysisJob.id == "done-job").update({"status": "completed"})
+        db.commit()
+        assert not job_queue._claim(db, "done-job", None)
+    finally:
+        db.close()
@@ -0,0 +1,22 @@
+from services.object_tracker import track_detections
+
+
+def _parked_car(frames: list[int]) -> list[dict]:
+    return [
+        {"frame": frame, "objects": ["car"], "confidences": [0.9], "boxes": [[10.0, 10.0, 60.0, 40.0]]}
+        for frame in frames
+    ]
+
+
+def test_adaptive_sampling_keeps_still_object_in_one_track():
+    # Adaptive sampling revisits a still scene only every SAMPLING_MAX_INTERVAL (10 s)
+    tracks = track_detections(_parked_car([0, 300, 600, 900]), fps=30, sampling="adaptive")
+    assert len(tracks) == 1
+    assert tracks[0].observations == 4
+    assert (tracks[0].first_frame, tracks[0].last_frame) == (0, 900)
+
+
+def test_fixed_sampling_splits_after_gap():
+    # Default stride 30 at 30 fps samples every second; a 10 s absence ends the track
+    tracks = track_detections(_parked_car([0, 30, 330]), fps=30, sampling="fixed")
+    assert len(tracks) == 2